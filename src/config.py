@@ -3,9 +3,11 @@ Configuration management for the TSA Polymarket Trading Bot.
 """
 
 import os
+import sys
+from functools import lru_cache
 from typing import Optional
-from pydantic import BaseModel, Field, field_validator
-from pydantic_settings import BaseSettings
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class TradingConfig(BaseModel):
@@ -14,6 +16,8 @@ class TradingConfig(BaseModel):
     max_buy_price: float = Field(default=0.95, ge=0.0, le=1.0)
     min_edge: float = Field(default=0.05, ge=0.0, le=1.0)
     dry_run: bool = Field(default=True)
+    max_concurrent_orders: int = Field(default=1, ge=1)
+    skip_no_scan_edge: float = Field(default=1.0, ge=0.0, le=1.0)
 
 
 class PolymarketConfig(BaseModel):
@@ -48,59 +52,86 @@ class Settings(BaseSettings):
     max_buy_price: float = Field(default=0.95, alias="MAX_BUY_PRICE")
     min_edge: float = Field(default=0.05, alias="MIN_EDGE")
     dry_run: bool = Field(default=True, alias="DRY_RUN")
+    max_concurrent_orders: int = Field(default=1, alias="MAX_CONCURRENT_ORDERS")
+    skip_no_scan_edge: float = Field(default=1.0, alias="SKIP_NO_SCAN_EDGE")
     poll_interval_seconds: int = Field(default=30, alias="POLL_INTERVAL_SECONDS")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    # Sub-configs are built once on first access and reused afterwards
+    _trading_config: Optional[TradingConfig] = PrivateAttr(default=None)
+    _polymarket_config: Optional[PolymarketConfig] = PrivateAttr(default=None)
+    _scraper_config: Optional[ScraperConfig] = PrivateAttr(default=None)
 
     def get_trading_config(self) -> TradingConfig:
-        return TradingConfig(
-            max_trade_size_usd=self.max_trade_size_usd,
-            max_buy_price=self.max_buy_price,
-            min_edge=self.min_edge,
-            dry_run=self.dry_run,
-        )
+        if self._trading_config is None:
+            self._trading_config = TradingConfig(
+                max_trade_size_usd=self.max_trade_size_usd,
+                max_buy_price=self.max_buy_price,
+                min_edge=self.min_edge,
+                dry_run=self.dry_run,
+                max_concurrent_orders=self.max_concurrent_orders,
+                skip_no_scan_edge=self.skip_no_scan_edge,
+            )
+        return self._trading_config
 
     def get_polymarket_config(self) -> PolymarketConfig:
-        return PolymarketConfig(
-            private_key=self.polymarket_private_key,
-            funder_address=self.polymarket_funder,
-            api_url=self.polymarket_api_url,
-            target_market_slug=self.target_market_slug,
-        )
+        if self._polymarket_config is None:
+            self._polymarket_config = PolymarketConfig(
+                private_key=self.polymarket_private_key,
+                funder_address=self.polymarket_funder,
+                api_url=self.polymarket_api_url,
+                target_market_slug=self.target_market_slug,
+            )
+        return self._polymarket_config
 
     def get_scraper_config(self) -> ScraperConfig:
-        return ScraperConfig(poll_interval_seconds=self.poll_interval_seconds)
+        if self._scraper_config is None:
+            self._scraper_config = ScraperConfig(poll_interval_seconds=self.poll_interval_seconds)
+        return self._scraper_config
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    """Load settings from environment and .env file."""
+    """Load settings from environment and .env file.
+
+    Cached so the .env file is parsed and validated only once per process.
+    """
     return Settings()
 
 
 def print_config(settings: Settings, hide_secrets: bool = True):
     """Print current configuration."""
-    print("Current Configuration:")
-    print("=" * 50)
     pk = settings.polymarket_private_key
     if hide_secrets and pk:
         pk = f"{pk[:6]}...{pk[-4:]}" if len(pk) > 10 else "****"
-    print(f"Polymarket API URL: {settings.polymarket_api_url}")
-    print(f"Private Key: {pk or '(not set)'}")
-    print(f"Funder Address: {settings.polymarket_funder or '(not set)'}")
-    print(f"Target Market: {settings.target_market_slug or '(not set)'}")
-    print()
-    print(f"Max Trade Size: ${settings.max_trade_size_usd}")
-    print(f"Max Buy Price: {settings.max_buy_price}")
-    print(f"Min Edge: {settings.min_edge}")
-    print(f"Dry Run: {settings.dry_run}")
-    print()
-    print(f"Poll Interval: {settings.poll_interval_seconds}s")
-    print(f"Log Level: {settings.log_level}")
-    print("=" * 50)
+    lines = [
+        "Current Configuration:",
+        "=" * 50,
+        f"Polymarket API URL: {settings.polymarket_api_url}",
+        f"Private Key: {pk or '(not set)'}",
+        f"Funder Address: {settings.polymarket_funder or '(not set)'}",
+        f"Target Market: {settings.target_market_slug or '(not set)'}",
+        "",
+        f"Max Trade Size: ${settings.max_trade_size_usd}",
+        f"Max Buy Price: {settings.max_buy_price}",
+        f"Min Edge: {settings.min_edge}",
+        f"Dry Run: {settings.dry_run}",
+        f"Max Concurrent Orders: {settings.max_concurrent_orders}",
+        f"Skip NO Scan Edge: {settings.skip_no_scan_edge}"
+        + (" (never skip)" if settings.skip_no_scan_edge >= 1.0 else ""),
+        "",
+        f"Poll Interval: {settings.poll_interval_seconds}s",
+        f"Log Level: {settings.log_level}",
+        "=" * 50,
+    ]
+    # One write instead of a flush per line
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
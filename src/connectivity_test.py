@@ -7,19 +7,31 @@ Usage:
 """
 
 import asyncio
+import functools
 import os
-import sys
+import ssl
 import time
 
-sys.path.insert(0, ".")
+import httpx
 
+from src.report import Reporter
 
-async def test_tsa():
-    import httpx
+# Built once and shared by the client - SSL context creation dominates
+# httpx client construction cost
+SSL_CTX = ssl.create_default_context()
 
-    print("=" * 50)
-    print("TEST 1: TSA.gov")
-    print("=" * 50)
+
+@functools.lru_cache(maxsize=1)
+def _load_clob():
+    """Import py_clob_client only when the auth probe actually runs."""
+    from py_clob_client.client import ClobClient
+    return ClobClient
+
+
+async def test_tsa(client, log=print):
+    log("=" * 50)
+    log("TEST 1: TSA.gov")
+    log("=" * 50)
 
     url = "https://www.tsa.gov/travel/passenger-volumes"
     headers = {
@@ -29,127 +41,119 @@ async def test_tsa():
 
     try:
         start = time.time()
-        async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-            resp = await client.get(url, headers=headers)
+        resp = await client.get(url, headers=headers, follow_redirects=True, timeout=30.0)
         elapsed = time.time() - start
 
-        print(f"  Status: {resp.status_code}")
-        print(f"  Latency: {elapsed:.2f}s")
-        print(f"  Content-Length: {len(resp.text)} chars")
+        log(f"  Status: {resp.status_code}")
+        log(f"  Latency: {elapsed:.2f}s")
+        log(f"  Content-Length: {len(resp.text)} chars")
 
         if resp.status_code == 200:
             has_data = "passenger" in resp.text.lower() or "throughput" in resp.text.lower()
-            print(f"  Contains passenger data: {has_data}")
+            log(f"  Contains passenger data: {has_data}")
             if has_data:
-                print("  [PASS] TSA.gov is accessible")
+                log("  [PASS] TSA.gov is accessible")
                 return True
             else:
-                print("  [WARN] Page loaded but may be a captcha/block page")
-                print(f"  Preview: {resp.text[:500]}")
+                log("  [WARN] Page loaded but may be a captcha/block page")
+                log(f"  Preview: {resp.text[:500]}")
                 return False
         elif resp.status_code == 403:
-            print("  [FAIL] 403 Forbidden - IP is blocked")
+            log("  [FAIL] 403 Forbidden - IP is blocked")
             return False
         elif resp.status_code == 429:
-            print("  [FAIL] 429 Rate Limited")
+            log("  [FAIL] 429 Rate Limited")
             return False
         else:
-            print("  [FAIL] Unexpected status code")
+            log("  [FAIL] Unexpected status code")
             return False
     except Exception as e:
-        print(f"  [FAIL] Connection error: {e}")
+        log(f"  [FAIL] Connection error: {e}")
         return False
 
 
-async def test_polymarket_gamma():
-    import httpx
-
-    print()
-    print("=" * 50)
-    print("TEST 2: Polymarket Gamma API")
-    print("=" * 50)
+async def test_polymarket_gamma(client, log=print):
+    log()
+    log("=" * 50)
+    log("TEST 2: Polymarket Gamma API")
+    log("=" * 50)
 
     url = "https://gamma-api.polymarket.com/events"
     params = {"limit": 1, "closed": "false"}
 
     try:
         start = time.time()
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url, params=params)
+        resp = await client.get(url, params=params, timeout=15.0)
         elapsed = time.time() - start
 
-        print(f"  Status: {resp.status_code}")
-        print(f"  Latency: {elapsed:.2f}s")
+        log(f"  Status: {resp.status_code}")
+        log(f"  Latency: {elapsed:.2f}s")
 
         if resp.status_code == 200:
             data = resp.json()
-            print(f"  Events returned: {len(data)}")
+            log(f"  Events returned: {len(data)}")
             if data:
                 title = data[0].get("title", "N/A")[:60]
-                print(f"  Sample event: {title}")
-            print("  [PASS] Gamma API is accessible")
+                log(f"  Sample event: {title}")
+            log("  [PASS] Gamma API is accessible")
             return True
         elif resp.status_code == 403:
-            print("  [FAIL] 403 Forbidden - IP blocked or geo-restricted")
+            log("  [FAIL] 403 Forbidden - IP blocked or geo-restricted")
             return False
         else:
-            print(f"  [FAIL] Unexpected status: {resp.status_code}")
+            log(f"  [FAIL] Unexpected status: {resp.status_code}")
             return False
     except Exception as e:
-        print(f"  [FAIL] Connection error: {e}")
+        log(f"  [FAIL] Connection error: {e}")
         return False
 
 
-async def test_polymarket_clob():
-    import httpx
-
-    print()
-    print("=" * 50)
-    print("TEST 3: Polymarket CLOB API")
-    print("=" * 50)
+async def test_polymarket_clob(client, log=print):
+    log()
+    log("=" * 50)
+    log("TEST 3: Polymarket CLOB API")
+    log("=" * 50)
 
     url = "https://clob.polymarket.com/time"
 
     try:
         start = time.time()
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(url)
+        resp = await client.get(url, timeout=15.0)
         elapsed = time.time() - start
 
-        print(f"  Status: {resp.status_code}")
-        print(f"  Latency: {elapsed:.2f}s")
+        log(f"  Status: {resp.status_code}")
+        log(f"  Latency: {elapsed:.2f}s")
 
         if resp.status_code == 200:
-            print(f"  Server time: {resp.text.strip()}")
-            print("  [PASS] CLOB API is accessible")
+            log(f"  Server time: {resp.text.strip()}")
+            log("  [PASS] CLOB API is accessible")
             return True
         elif resp.status_code == 403:
-            print("  [FAIL] 403 Forbidden - IP blocked or geo-restricted")
+            log("  [FAIL] 403 Forbidden - IP blocked or geo-restricted")
             return False
         else:
-            print(f"  [FAIL] Unexpected status: {resp.status_code}")
+            log(f"  [FAIL] Unexpected status: {resp.status_code}")
             return False
     except Exception as e:
-        print(f"  [FAIL] Connection error: {e}")
+        log(f"  [FAIL] Connection error: {e}")
         return False
 
 
-async def test_polymarket_auth():
-    print()
-    print("=" * 50)
-    print("TEST 4: Polymarket Authenticated Connection")
-    print("=" * 50)
+async def test_polymarket_auth(log=print):
+    log()
+    log("=" * 50)
+    log("TEST 4: Polymarket Authenticated Connection")
+    log("=" * 50)
 
     pk = os.environ.get("POLYMARKET_PRIVATE_KEY", "")
     funder = os.environ.get("POLYMARKET_FUNDER", "")
 
     if not pk:
-        print("  [SKIP] POLYMARKET_PRIVATE_KEY not set")
+        log("  [SKIP] POLYMARKET_PRIVATE_KEY not set")
         return None
 
     try:
-        from py_clob_client.client import ClobClient
-
+        ClobClient = _load_clob()
         client = ClobClient(
             host="https://clob.polymarket.com",
             key=pk if pk.startswith("0x") else f"0x{pk}",
@@ -157,51 +161,50 @@ async def test_polymarket_auth():
             funder=funder or None,
         )
 
+        # EIP-712 signing and the key-derivation request block - keep them
+        # off the event loop so the other probes keep running
         start = time.time()
-        creds = client.create_or_derive_api_creds()
+        creds = await asyncio.to_thread(client.create_or_derive_api_creds)
         client.set_api_creds(creds)
         elapsed = time.time() - start
 
         api_key_preview = creds.api_key[:15]
-        print(f"  Auth latency: {elapsed:.2f}s")
-        print(f"  API key derived: {api_key_preview}...")
-        print("  [PASS] Authenticated successfully")
+        log(f"  Auth latency: {elapsed:.2f}s")
+        log(f"  API key derived: {api_key_preview}...")
+        log("  [PASS] Authenticated successfully")
         return True
     except Exception as e:
         err_str = str(e)
-        print(f"  [FAIL] Auth error: {err_str}")
+        log(f"  [FAIL] Auth error: {err_str}")
         if "403" in err_str or "forbidden" in err_str.lower():
-            print("  Likely geo-restricted or IP blocked")
+            log("  Likely geo-restricted or IP blocked")
         return False
 
 
-async def check_ip():
-    import httpx
-
+async def check_ip(client):
     print()
     print("=" * 50)
     print("OUTBOUND IP CHECK")
     print("=" * 50)
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get("https://api.ipify.org?format=json")
-            ip_data = resp.json()
-            ip = ip_data.get("ip", "unknown")
-            print(f"  Your outbound IP: {ip}")
-
-            resp2 = await client.get(f"https://ipapi.co/{ip}/json/")
-            if resp2.status_code == 200:
-                geo = resp2.json()
-                country = geo.get("country_name", "?")
-                region = geo.get("region", "?")
-                org = geo.get("org", "?")
-                cc = geo.get("country_code", "")
-                print(f"  Country: {country}")
-                print(f"  Region: {region}")
-                print(f"  ISP: {org}")
-                if cc != "US":
-                    print("  [WARN] Non-US IP - Polymarket may geo-restrict")
+        resp = await client.get("https://api.ipify.org?format=json", timeout=10.0)
+        ip_data = resp.json()
+        ip = ip_data.get("ip", "unknown")
+        print(f"  Your outbound IP: {ip}")
+
+        resp2 = await client.get(f"https://ipapi.co/{ip}/json/", timeout=10.0)
+        if resp2.status_code == 200:
+            geo = resp2.json()
+            country = geo.get("country_name", "?")
+            region = geo.get("region", "?")
+            org = geo.get("org", "?")
+            cc = geo.get("country_code", "")
+            print(f"  Country: {country}")
+            print(f"  Region: {region}")
+            print(f"  ISP: {org}")
+            if cc != "US":
+                print("  [WARN] Non-US IP - Polymarket may geo-restrict")
     except Exception as e:
         print(f"  Could not determine IP: {e}")
 
@@ -212,12 +215,35 @@ async def main():
     print("Run this on your deployment host to verify access")
     print()
 
-    await check_ip()
+    # One client for every probe so the polymarket.com calls reuse TCP/TLS.
+    # HTTP/2 lets concurrent probes to the same host share a connection.
+    async with httpx.AsyncClient(
+        http2=True,
+        verify=SSL_CTX,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=30.0,
+    ) as client:
+        await check_ip(client)
+        print()
+
+        # Probes are independent - run them concurrently, then print
+        # each one's output in order
+        logs = [Reporter() for _ in range(4)]
+        probe_results = await asyncio.gather(
+            test_tsa(client, logs[0]),
+            test_polymarket_gamma(client, logs[1]),
+            test_polymarket_clob(client, logs[2]),
+            test_polymarket_auth(logs[3]),
+            return_exceptions=True,
+        )
 
-    tsa_ok = await test_tsa()
-    gamma_ok = await test_polymarket_gamma()
-    clob_ok = await test_polymarket_clob()
-    auth_ok = await test_polymarket_auth()
+    for log, result in zip(logs, probe_results):
+        if isinstance(result, BaseException):
+            log(f"  [FAIL] Probe crashed: {result}")
+        log.flush()
+    tsa_ok, gamma_ok, clob_ok, auth_ok = (
+        False if isinstance(r, BaseException) else r for r in probe_results
+    )
 
     print()
     print("=" * 50)
@@ -6,61 +6,132 @@ Orchestrates the TSA data monitoring and trading execution loop.
 
 import asyncio
 import logging
+import random
 import signal
+import ssl
 import sys
-from datetime import datetime, time
+from datetime import date, datetime, time, timedelta
+from time import monotonic
 from typing import Optional
-import pytz
+from zoneinfo import ZoneInfo
+import httpx
 
 from .config import load_settings, print_config, Settings
 from .tsa_scraper import TSAScraper, TSADataPoint
-from .polymarket import PolymarketClient
+from .polymarket import PolymarketClient, Market, OrderBook
 from .trading import TradingEngine, TradingDecision
 
 logger = logging.getLogger(__name__)
 
-ET_TIMEZONE = pytz.timezone("America/New_York")
+ET_TIMEZONE = ZoneInfo("America/New_York")
 TSA_UPDATE_TIME = time(9, 0)
 
+# Hot polling window (ET, weekdays) - built once instead of per poll tick
+HOT_WINDOW_START = time(8, 0)
+HOT_WINDOW_END = time(9, 30)
+
+# Order book stream reconnect/rediscovery backoff bounds (seconds)
+STREAM_RETRY_MIN = 1.0
+STREAM_RETRY_MAX = 60.0
+
+# Retry backoff (seconds) when TSA rate-limits, errors out or is unreachable.
+# Each retry waits at least the current poll interval
+ERROR_BACKOFF_MIN = 1.0
+ERROR_BACKOFF_MAX = 60.0
+
+# Built once - SSL context creation dominates httpx client construction
+_SHARED_SSL_CTX = ssl.create_default_context()
+
 
 class TradingBot:
     """Main trading bot orchestrator."""
 
     def __init__(self, settings: Settings):
         self.settings = settings
+
+        # Validated once here; hot paths read plain attributes instead of
+        # going through the pydantic settings object every tick
+        self._scraper_cfg = settings.get_scraper_config()
+        self._pm_cfg = settings.get_polymarket_config()
+        self._trading_cfg = settings.get_trading_config()
+        self._target_slug = settings.target_market_slug
+        self._poll_interval = settings.poll_interval_seconds
+        self.http_client: Optional[httpx.AsyncClient] = None
         self.scraper: Optional[TSAScraper] = None
         self.polymarket: Optional[PolymarketClient] = None
         self.engine: Optional[TradingEngine] = None
         self._running = False
         self._last_trade_decision: Optional[TradingDecision] = None
+        self._hot_window_cache: tuple[float, bool] = (float("-inf"), False)
+        self._discovered_slugs: dict[date, str] = {}
+
+        # WebSocket order book stream for the next expected market, kept up
+        # during the hot window so trading can skip the REST book fetch
+        self._stream_task: Optional[asyncio.Task] = None
+        self._stream_queue: asyncio.Queue = asyncio.Queue()
+        self._stream_date: Optional[date] = None
+        self._stream_slug: Optional[str] = None
+        self._stream_market: Optional[Market] = None
+        self._stream_books: dict[str, OrderBook] = {}
+        # Reconnect/rediscovery backoff after a dropped stream or a market
+        # that isn't listed yet - retried no sooner than _stream_retry_at
+        self._stream_backoff = STREAM_RETRY_MIN
+        self._stream_retry_at = float("-inf")
 
     async def initialize(self):
         """Initialize all components."""
         logger.info("Initializing TSA Polymarket Trading Bot...")
 
-        self.scraper = TSAScraper(
-            timeout=self.settings.get_scraper_config().timeout_seconds
+        scraper_timeout = self._scraper_cfg.timeout_seconds
+
+        # Long-lived client shared by all async HTTP callers for the whole
+        # process, so TLS setup and connections are reused across polls
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=httpx.Timeout(scraper_timeout, connect=10.0),
+            verify=_SHARED_SSL_CTX,
         )
 
-        polymarket_config = self.settings.get_polymarket_config()
-        if polymarket_config.private_key:
-            self.polymarket = PolymarketClient(polymarket_config)
+        self.scraper = TSAScraper(timeout=scraper_timeout, client=self.http_client)
+
+        if self._pm_cfg.private_key:
+            # Async CLOB reads share the bot's pooled client
+            self.polymarket = PolymarketClient(self._pm_cfg, http_client=self.http_client)
             try:
-                self.polymarket.connect()
+                await asyncio.to_thread(self.polymarket.connect)
                 logger.info("Connected to Polymarket")
 
                 self.engine = TradingEngine(
                     polymarket_client=self.polymarket,
-                    config=self.settings.get_trading_config(),
+                    config=self._trading_cfg,
                 )
             except Exception as e:
-                logger.error(f"Failed to connect to Polymarket: {e}")
+                logger.error("Failed to connect to Polymarket: %s", e)
                 logger.info("Running in monitor-only mode")
+                # Release the client's pooled connections before dropping it
+                await self.polymarket.aclose()
                 self.polymarket = None
                 self.engine = None
         else:
             logger.warning("No Polymarket credentials - running in monitor-only mode")
 
+    def _in_hot_window(self) -> bool:
+        """True during the weekday 8:00-9:30 AM ET publication window.
+
+        Checked several times per tick, so the answer is reused for up to
+        a second instead of building a tz-aware datetime on every call.
+        """
+        checked_at, in_window = self._hot_window_cache
+        mono = monotonic()
+        if mono - checked_at < 1.0:
+            return in_window
+
+        now_et = datetime.now(ET_TIMEZONE)
+        in_window = now_et.weekday() < 5 and HOT_WINDOW_START <= now_et.time() <= HOT_WINDOW_END
+        self._hot_window_cache = (mono, in_window)
+        return in_window
+
     def _get_poll_interval(self) -> int:
         """Return poll interval based on time of day.
 
@@ -69,23 +140,144 @@ class TradingBot:
         TSA typically publishes data around 8:20 AM ET.
         Outside window: use configured POLL_INTERVAL_SECONDS
         """
-        now_et = datetime.now(ET_TIMEZONE)
-        is_weekday = now_et.weekday() < 5
-        in_hot_window = time(8, 0) <= now_et.time() <= time(9, 30)
-
-        if is_weekday and in_hot_window:
+        if self._in_hot_window():
             return 1
-        return self.settings.poll_interval_seconds
+        return self._poll_interval
+
+    async def _manage_book_stream(self):
+        """Keep the next market's order books streaming during the hot window.
+
+        The next release is expected for the day after the last known data
+        point. Discovery is retried until it finds that date's market; a
+        dropped WebSocket is reconnected. Both retries back off
+        exponentially so a failing endpoint isn't hit on every tick.
+        """
+        if not self._in_hot_window():
+            self._stop_book_stream()
+            return
+
+        self._drain_book_stream()
+        if self._stream_task and not self._stream_task.done():
+            return
+
+        if self._stream_task:
+            # Stream dropped - its books can no longer be trusted
+            if not self._stream_task.cancelled() and self._stream_task.exception():
+                logger.warning("Order book stream dropped: %s", self._stream_task.exception())
+            self._stream_task = None
+            self._stream_books = {}
+            delay = self._delay_book_stream()
+            logger.info("Reconnecting order book stream in %.1fs", delay)
+
+        if monotonic() < self._stream_retry_at:
+            return
+        if not self.scraper.last_known_date:
+            return
+        next_date = self.scraper.last_known_date + timedelta(days=1)
+
+        if self._stream_date != next_date:
+            # Only a found market is kept for the date - until then the
+            # lookup is retried, so a market listed later is still streamed
+            self._stream_date = None
+            self._stream_slug = None
+            self._stream_market = None
+            slug = self._target_slug or await self._discover_slug(next_date)
+            market = None
+            if slug:
+                market = await asyncio.to_thread(self.polymarket.get_market_by_slug, slug)
+            if not market:
+                delay = self._delay_book_stream()
+                logger.info("No market for %s yet - retrying in %.1fs", next_date, delay)
+                return
+            self._stream_date = next_date
+            self._stream_slug = slug
+            self._stream_market = market
+            self._stream_backoff = STREAM_RETRY_MIN
+            if self.engine:
+                # Match brackets now rather than when the data lands
+                self.engine.index_brackets(market)
+
+        token_ids = [
+            token_id
+            for outcome in self._stream_market.outcomes
+            for token_id in (outcome.token_id, outcome.no_token_id)
+            if token_id
+        ]
+        self._stream_queue = asyncio.Queue()
+        self._stream_task = asyncio.create_task(
+            self.polymarket.subscribe_books(token_ids, self._stream_queue)
+        )
+
+    async def _discover_slug(self, target_date: date) -> Optional[str]:
+        """Resolve the TSA market slug for target_date, at most once per date.
+
+        The book stream usually discovers the next market during the hot
+        window, so the trading path gets a cache hit when the data lands.
+        Failures are not cached so a later call can retry.
+        """
+        slug = self._discovered_slugs.get(target_date)
+        if slug is None:
+            slug = await asyncio.to_thread(self.polymarket.discover_tsa_market, target_date)
+            if slug:
+                self._discovered_slugs[target_date] = slug
+        return slug
+
+    def _drain_book_stream(self):
+        """Move pushed book updates into the latest-book map."""
+        if self._stream_queue.empty():
+            return
+        while not self._stream_queue.empty():
+            book = self._stream_queue.get_nowait()
+            self._stream_books[book.token_id] = book
+        # The stream is delivering - the next drop starts a fresh backoff
+        self._stream_backoff = STREAM_RETRY_MIN
+
+    def _delay_book_stream(self) -> float:
+        """Push the next stream (re)connect or discovery attempt back."""
+        delay = min(STREAM_RETRY_MAX, self._stream_backoff)
+        self._stream_backoff *= 2
+        self._stream_retry_at = monotonic() + delay
+        return delay
+
+    def _stop_book_stream(self):
+        if self._stream_task:
+            self._stream_task.cancel()
+            self._stream_task = None
+        self._stream_books = {}
+        self._stream_date = None
+        self._stream_slug = None
+        self._stream_market = None
+        self._stream_backoff = STREAM_RETRY_MIN
+        self._stream_retry_at = float("-inf")
+
+    def _market_from_stream(self, market_slug: str) -> Optional[Market]:
+        """Return the market with streamed books, or None to fall back to REST."""
+        if market_slug != self._stream_slug or not self._stream_market:
+            return None
+        if not self._stream_task or self._stream_task.done():
+            return None
+
+        self._drain_book_stream()
+        market = self._stream_market
+        for outcome in market.outcomes:
+            for token_id in (outcome.token_id, outcome.no_token_id):
+                if token_id and token_id not in self._stream_books:
+                    return None  # No snapshot yet for this token
+
+        for outcome in market.outcomes:
+            outcome.order_book = self._stream_books.get(outcome.token_id)
+            outcome.no_order_book = self._stream_books.get(outcome.no_token_id)
+        return market
 
     async def run(self):
         """Main bot loop with dynamic polling."""
         self._running = True
 
-        logger.info(f"Starting monitoring loop")
-        logger.info(f"  Default poll interval: {self.settings.poll_interval_seconds}s")
-        logger.info(f"  Hot window (8:00-9:30 AM ET weekdays): 1s (conditional GET)")
-        logger.info(f"Target market: {self.settings.target_market_slug or '(auto-discover)'}")
-        logger.info(f"Dry run mode: {self.settings.dry_run}")
+        logger.info("Starting monitoring loop")
+        logger.info("  Default poll interval: %ss", self.settings.poll_interval_seconds)
+        logger.info("  Hot window (8:00-9:30 AM ET weekdays): 1s (conditional GET)")
+        logger.info("Target market: %s", self.settings.target_market_slug or '(auto-discover)')
+        logger.info("Dry run mode: %s", self.settings.dry_run)
 
         async with self.scraper:
             logger.info("Fetching initial TSA data...")
@@ -93,22 +285,44 @@ class TradingBot:
             if initial_data:
                 self.scraper.last_known_date = initial_data.date
                 logger.info(
-                    f"Baseline established: {initial_data.date} - "
-                    f"{initial_data.formatted_count} ({initial_data.get_bracket()})"
+                    "Baseline established: %s - %s (%s)",
+                    initial_data.date, initial_data.formatted_count, initial_data.get_bracket(),
                 )
             else:
                 logger.warning("Could not fetch initial TSA data")
 
             last_logged_interval = None
+            error_backoff = ERROR_BACKOFF_MIN
             while self._running:
                 try:
                     await self._check_and_trade()
+                    error_backoff = ERROR_BACKOFF_MIN
+                except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                    # Rate limited, failing or unreachable - back off
+                    # exponentially with jitter from the poll interval up, so
+                    # an erroring TSA is never polled faster than a healthy one
+                    interval = self._get_poll_interval()
+                    error_backoff = max(error_backoff, interval)
+                    delay = max(interval, min(ERROR_BACKOFF_MAX, error_backoff) * (0.5 + random.random()))
+                    error_backoff *= 2
+                    if isinstance(e, httpx.HTTPStatusError):
+                        logger.warning("TSA returned %s - backing off %.1fs", e.response.status_code, delay)
+                    else:
+                        logger.warning("TSA request failed (%r) - backing off %.1fs", e, delay)
+                    await asyncio.sleep(delay)
+                    continue
                 except Exception as e:
-                    logger.error(f"Error in main loop: {e}", exc_info=True)
+                    logger.error("Error in main loop: %s", e, exc_info=True)
+
+                if self.polymarket:
+                    try:
+                        await self._manage_book_stream()
+                    except Exception as e:
+                        logger.error("Order book stream error: %s", e)
 
                 interval = self._get_poll_interval()
                 if interval != last_logged_interval:
-                    logger.info(f"Poll interval: {interval}s")
+                    logger.info("Poll interval: %ss", interval)
                     last_logged_interval = interval
                 await asyncio.sleep(interval)
 
@@ -121,9 +335,9 @@ class TradingBot:
 
         logger.info("=" * 60)
         logger.info("NEW TSA DATA DETECTED!")
-        logger.info(f"Date: {new_data.date}")
-        logger.info(f"Passenger Count: {new_data.formatted_count}")
-        logger.info(f"Bracket: {new_data.get_bracket()}")
+        logger.info("Date: %s", new_data.date)
+        logger.info("Passenger Count: %s", new_data.formatted_count)
+        logger.info("Bracket: %s", new_data.get_bracket())
         logger.info("=" * 60)
 
         await self._execute_trading(new_data)
@@ -134,24 +348,29 @@ class TradingBot:
             logger.info("No trading engine - skipping trade execution")
             return
 
-        market_slug = self.settings.target_market_slug
+        market_slug = self._target_slug
         if not market_slug:
             logger.info("No TARGET_MARKET_SLUG set - attempting auto-discovery...")
-            market_slug = self.polymarket.discover_tsa_market(tsa_data.date)
+            market_slug = await self._discover_slug(tsa_data.date)
             if not market_slug:
                 logger.error("Auto-discovery failed - cannot determine market slug")
                 return
-            logger.info(f"Auto-discovered market slug: {market_slug}")
+            logger.info("Auto-discovered market slug: %s", market_slug)
 
-        logger.info(f"Fetching market: {market_slug}")
-        market = self.polymarket.get_market_with_books(market_slug)
+        market = self._market_from_stream(market_slug)
+        if market:
+            logger.info("Using streamed order books for %s", market_slug)
+        else:
+            logger.info("Fetching market: %s", market_slug)
+            market = await self.polymarket.get_market_with_books_async(market_slug)
 
         if not market:
-            logger.error(f"Could not fetch market: {market_slug}")
+            logger.error("Could not fetch market: %s", market_slug)
             return
 
-        logger.info(f"Market: {market.question}")
-        logger.info(f"Outcomes: {[o.outcome for o in market.outcomes]}")
+        logger.info("Market: %s", market.question)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Outcomes: %s", [o.outcome for o in market.outcomes])
 
         decision = self.engine.analyze_market(tsa_data, market)
         self._last_trade_decision = decision
@@ -162,24 +381,36 @@ class TradingBot:
 
         for signal in decision.signals:
             logger.info(
-                f"Signal: {signal.action} on '{signal.outcome.outcome}' - "
-                f"${signal.size_usd:.2f} @ {signal.target_price or 0:.3f} "
-                f"(edge: {signal.edge:.1%}) - {signal.reason}"
+                "Signal: %s on '%s' - $%.2f @ %.3f (edge: %.1f%%) - %s",
+                signal.action, signal.outcome.outcome, signal.size_usd,
+                signal.target_price or 0, signal.edge * 100, signal.reason,
             )
 
-        results = self.engine.execute_signals(decision.signals)
+        # Order signing and submission block - run them off the event loop
+        # so the book stream and signal handlers keep running. TSA polling
+        # waits: run() awaits this call before its next tick
+        results = await asyncio.to_thread(self.engine.execute_signals, decision.signals)
 
         for result in results:
             if result.success:
-                logger.info(f"Trade successful: {result.order_id}")
+                logger.info("Trade successful: %s", result.order_id)
             else:
-                logger.error(f"Trade failed: {result.error}")
+                logger.error("Trade failed: %s", result.error)
 
     def stop(self):
         """Stop the bot gracefully."""
         logger.info("Stopping bot...")
         self._running = False
 
+    async def close(self):
+        """Release network resources."""
+        self._stop_book_stream()
+        if self.polymarket:
+            await self.polymarket.aclose()
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+
     @property
     def status(self) -> dict:
         """Get current bot status."""
@@ -192,16 +423,23 @@ class TradingBot:
         }
 
 
+_LOG_LEVELS = {
+    name: getattr(logging, name) for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+}
+
+# Per-request HTTP client logs are noise at 1s polling
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
 def setup_logging(level: str = "INFO"):
     """Configure logging."""
     logging.basicConfig(
-        level=getattr(logging, level.upper(), logging.INFO),
+        level=_LOG_LEVELS.get(level.upper(), logging.INFO),
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
         handlers=[logging.StreamHandler(sys.stdout)],
     )
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
 async def main():
@@ -214,7 +452,7 @@ async def main():
     bot = TradingBot(settings)
     await bot.initialize()
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
 
     def signal_handler():
         bot.stop()
@@ -231,6 +469,7 @@ async def main():
         logger.info("Keyboard interrupt received")
     finally:
         bot.stop()
+        await bot.close()
         logger.info("Bot stopped")
 
 
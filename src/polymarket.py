@@ -5,14 +5,23 @@ Handles connection to Polymarket, reading order books, and executing trades.
 Uses Gamma API for market discovery and CLOB API for order execution.
 """
 
-import json
+import asyncio
 import logging
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+import re
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter
+from time import monotonic
 from typing import Optional
-from enum import Enum
 
 import httpx
+import orjson
+import websockets
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import OrderArgs, OrderType, MarketOrderArgs
 from py_clob_client.order_builder.constants import BUY, SELL
@@ -22,47 +31,120 @@ from .config import PolymarketConfig
 logger = logging.getLogger(__name__)
 
 GAMMA_API_URL = "https://gamma-api.polymarket.com"
+CLOB_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
 
+# Seconds a Gamma event lookup is reused before it is fetched again
+EVENT_CACHE_TTL = 30.0
 
-class Side(str, Enum):
-    BUY = "BUY"
-    SELL = "SELL"
+# Slug month names - avoids locale-aware strftime('%B')
+_MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
 
+# Gamma's clobTokenIds is a JSON-encoded array of numeric id strings
+_TOKEN_ID_RE = re.compile(r'"(\d+)"')
 
-@dataclass
+# C-level sort key - cheaper per comparison than a lambda
+_PRICE = attrgetter("price")
+
+# Built once - SSL context creation dominates httpx client construction
+_SSL_CTX = ssl.create_default_context()
+
+
+@lru_cache(maxsize=16)
+def _build_tsa_slug(target_date: date) -> str:
+    """TSA passenger count market slug: number-of-tsa-passengers-{month}-{day}."""
+    return f"number-of-tsa-passengers-{_MONTHS[target_date.month - 1]}-{target_date.day}"
+
+
+def _parse_token_ids(raw) -> list[str]:
+    """Extract token ids from a clobTokenIds value without a JSON parse."""
+    if isinstance(raw, list):
+        return raw
+    if not isinstance(raw, str) or not raw.startswith("["):
+        return []
+    return _TOKEN_ID_RE.findall(raw)
+
+
+@dataclass(slots=True)
 class OrderBookLevel:
     price: float
     size: float
 
 
-@dataclass
-class OrderBook:
-    token_id: str
-    bids: list[OrderBookLevel]
-    asks: list[OrderBookLevel]
+def _parse_levels(raw_levels: list[dict]) -> list[OrderBookLevel]:
+    """Build OrderBookLevels from CLOB JSON levels ({"price": "...", "size": "..."})."""
+    return [
+        OrderBookLevel(price=float(level["price"]), size=float(level["size"]))
+        for level in raw_levels
+    ]
 
-    @property
-    def best_bid(self) -> Optional[float]:
-        return self.bids[0].price if self.bids else None
 
-    @property
-    def best_ask(self) -> Optional[float]:
-        return self.asks[0].price if self.asks else None
-
-    @property
-    def mid_price(self) -> Optional[float]:
-        if self.best_bid and self.best_ask:
-            return (self.best_bid + self.best_ask) / 2
-        return self.best_bid or self.best_ask
+def _book_order(levels: list[OrderBookLevel], descending: bool) -> list[OrderBookLevel]:
+    """Put levels in book order (bids high-to-low, asks low-to-high).
 
-    @property
-    def spread(self) -> Optional[float]:
-        if self.best_bid and self.best_ask:
-            return self.best_ask - self.best_bid
-        return None
+    The CLOB sends each side already ordered, though not always in the
+    direction we want, so an O(N) check usually replaces the sort.
+    """
+    prices = [level.price for level in levels]
+    steps = list(zip(prices, prices[1:]))
+    if all((a >= b) if descending else (a <= b) for a, b in steps):
+        return levels
+    if all((a <= b) if descending else (a >= b) for a, b in steps):
+        levels.reverse()
+        return levels
+    levels.sort(key=_PRICE, reverse=descending)
+    return levels
 
 
-@dataclass
+@dataclass(slots=True)
+class OrderBook:
+    token_id: str
+    bids: list[OrderBookLevel]
+    asks: list[OrderBookLevel]
+    # Derived from bids/asks by refresh() - call it after mutating levels
+    best_bid: Optional[float] = field(init=False, default=None)
+    best_ask: Optional[float] = field(init=False, default=None)
+    mid_price: Optional[float] = field(init=False, default=None)
+    spread: Optional[float] = field(init=False, default=None)
+    bid_depth: float = field(init=False, default=0.0)
+    ask_depth: float = field(init=False, default=0.0)
+    ask_notional: float = field(init=False, default=0.0)
+    # Running USD notional through each ask level, best price first
+    ask_cum_notional: list[float] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the derived top-of-book and depth values."""
+        best_bid = self.bids[0].price if self.bids else None
+        best_ask = self.asks[0].price if self.asks else None
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+        if best_bid and best_ask:
+            self.mid_price = (best_bid + best_ask) / 2
+            self.spread = best_ask - best_bid
+        else:
+            self.mid_price = best_bid or best_ask
+            self.spread = None
+        self.bid_depth = sum(level.size for level in self.bids)
+        self.ask_depth = sum(level.size for level in self.asks)
+        self.ask_cum_notional = list(accumulate(level.size * level.price for level in self.asks))
+        self.ask_notional = self.ask_cum_notional[-1] if self.ask_cum_notional else 0.0
+
+    def ask_notional_upto(self, max_price: float) -> float:
+        """USD notional offered at or below max_price."""
+        levels = bisect_right(self.asks, max_price, key=_PRICE)
+        return self.ask_cum_notional[levels - 1] if levels else 0.0
+
+    def fill_depth(self, usd: float) -> int:
+        """Number of ask levels a market buy of usd walks through."""
+        return min(bisect_left(self.ask_cum_notional, usd) + 1, len(self.asks))
+
+
+@dataclass(slots=True)
 class MarketOutcome:
     token_id: str
     outcome: str
@@ -73,15 +155,22 @@ class MarketOutcome:
     no_order_book: Optional[OrderBook] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Market:
     condition_id: str
     question: str
     outcomes: list[MarketOutcome]
     neg_risk_market_id: str = ""
+    # Bracket name -> outcome, filled by TradingEngine.index_brackets
+    bracket_index: dict[str, MarketOutcome] = field(default_factory=dict, repr=False)
+    # Outcomes with a NO token, the candidates for BUY_NO
+    tradeable_no: list[MarketOutcome] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.tradeable_no = [o for o in self.outcomes if o.no_token_id]
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeResult:
     success: bool
     order_id: Optional[str] = None
@@ -93,16 +182,42 @@ class TradeResult:
 class PolymarketClient:
     """Client for interacting with Polymarket CLOB API."""
 
-    def __init__(self, config: PolymarketConfig):
+    def __init__(self, config: PolymarketConfig, http_client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self._client: Optional[ClobClient] = None
         self._api_creds = None
+        # Pooled HTTP/2 client for public CLOB reads - parallel book fetches
+        # share warm connections instead of handshaking per request
+        self._http = httpx.Client(
+            base_url=config.api_url,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=15.0,
+            verify=_SSL_CTX,
+        )
+        # Same for Gamma market discovery, polled every tick in the hot window.
+        # Both stay sync: their callers run in worker threads (to_thread)
+        self._gamma = httpx.Client(
+            base_url=GAMMA_API_URL,
+            http2=True,
+            timeout=15.0,
+            verify=_SSL_CTX,
+        )
+        # Async twin of _http for CLOB reads - the caller's shared client when
+        # given, else one created on first use inside the running loop
+        self._ahttp: Optional[httpx.AsyncClient] = http_client
+        self._owns_ahttp = http_client is None  # Injected clients are closed by their owner
+        # Absolute CLOB URLs, so an injected client needs no base_url
+        self._book_url = f"{config.api_url.rstrip('/')}/book"
+        self._books_url = f"{config.api_url.rstrip('/')}/books"
+        # slug -> (fetched at, event) for Gamma lookups
+        self._event_cache: dict[str, tuple[float, dict]] = {}
 
     def connect(self):
         if not self.config.private_key:
             raise ValueError("Private key is required")
 
-        logger.info(f"Connecting to Polymarket CLOB at {self.config.api_url}")
+        logger.info("Connecting to Polymarket CLOB at %s", self.config.api_url)
 
         self._client = ClobClient(
             host=self.config.api_url,
@@ -114,47 +229,91 @@ class PolymarketClient:
         self._api_creds = self._client.create_or_derive_api_creds()
         self._client.set_api_creds(self._api_creds)
 
+        # Open the CLOB connections now so the first hot-window book fetch
+        # and order don't pay the TCP+TLS handshake
+        try:
+            self._http.get("/time").raise_for_status()
+            self._client.get_server_time()
+        except Exception as e:
+            logger.warning("CLOB warm-up request failed: %s", e)
+
         logger.info("Successfully connected to Polymarket")
 
+    def close(self):
+        """Close pooled HTTP connections."""
+        self._http.close()
+        self._gamma.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close pooled HTTP connections, including an owned async client."""
+        self.close()
+        if self._ahttp is not None and self._owns_ahttp:
+            await self._ahttp.aclose()
+            self._ahttp = None
+
+    @property
+    def ahttp(self) -> httpx.AsyncClient:
+        if self._ahttp is None:
+            self._ahttp = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=16),
+                timeout=15.0,
+                verify=_SSL_CTX,
+            )
+        return self._ahttp
+
     @property
     def client(self) -> ClobClient:
         if not self._client:
             raise RuntimeError("Not connected. Call connect() first.")
         return self._client
 
+    def _get_event(self, slug: str) -> Optional[dict]:
+        """Fetch a Gamma event by slug, reusing lookups younger than EVENT_CACHE_TTL.
+
+        Returns None when no event exists. Request errors propagate.
+        """
+        now = monotonic()
+        cached = self._event_cache.get(slug)
+        if cached and now - cached[0] < EVENT_CACHE_TTL:
+            return cached[1]
+
+        resp = self._gamma.get("/events", params={"slug": slug})
+        resp.raise_for_status()
+        events = orjson.loads(resp.content)
+        if not events:
+            return None
+
+        self._event_cache[slug] = (now, events[0])
+        return events[0]
+
     def get_market_by_slug(self, event_slug: str) -> Optional[Market]:
         """Fetch market details from Gamma API by event slug."""
         try:
-            resp = httpx.get(
-                f"{GAMMA_API_URL}/events",
-                params={"slug": event_slug},
-                timeout=15.0,
-            )
-            resp.raise_for_status()
-            events = resp.json()
-
-            if not events:
-                logger.error(f"No event found for slug: {event_slug}")
+            event = self._get_event(event_slug)
+            if not event:
+                logger.error("No event found for slug: %s", event_slug)
                 return None
 
-            event = events[0]
             sub_markets = event.get("markets", [])
             neg_risk_market_id = event.get("negRiskMarketID", "")
 
-            logger.info(f"Found event: {event.get('title', '')}")
-            logger.info(f"Neg-risk market ID: {neg_risk_market_id}")
-            logger.info(f"Sub-markets: {len(sub_markets)}")
+            logger.info("Found event: %s", event.get('title', ''))
+            logger.info("Neg-risk market ID: %s", neg_risk_market_id)
+            logger.info("Sub-markets: %d", len(sub_markets))
 
             outcomes = []
             for sm in sub_markets:
                 if not sm.get("active", False) and sm.get("groupItemTitle") != "Other":
                     continue
 
-                clob_token_ids_raw = sm.get("clobTokenIds", "[]")
-                try:
-                    clob_token_ids = json.loads(clob_token_ids_raw)
-                except (json.JSONDecodeError, TypeError):
-                    clob_token_ids = []
+                clob_token_ids = _parse_token_ids(sm.get("clobTokenIds", "[]"))
 
                 yes_token_id = clob_token_ids[0] if len(clob_token_ids) > 0 else ""
                 no_token_id = clob_token_ids[1] if len(clob_token_ids) > 1 else ""
@@ -170,7 +329,7 @@ class PolymarketClient:
                 ))
 
                 price = sm.get("outcomePrices", "")
-                logger.info(f"  {group_title}: YES_token={yes_token_id[:15]}... price={price}")
+                logger.info("  %s: YES_token=%.15s... price=%s", group_title, yes_token_id, price)
 
             return Market(
                 condition_id=neg_risk_market_id or event.get("id", ""),
@@ -179,54 +338,203 @@ class PolymarketClient:
                 neg_risk_market_id=neg_risk_market_id,
             )
         except Exception as e:
-            logger.error(f"Failed to get market by slug {event_slug}: {e}")
+            logger.error("Failed to get market by slug %s: %s", event_slug, e)
             return None
 
     def get_order_book(self, token_id: str) -> Optional[OrderBook]:
         try:
-            book_data = self.client.get_order_book(token_id)
-
-            bids = [
-                OrderBookLevel(
-                    price=float(level.price),
-                    size=float(level.size),
-                )
-                for level in book_data.bids
-            ]
+            # Public endpoint - fetched directly so it rides the pooled client
+            resp = self._http.get("/book", params={"token_id": token_id})
+            resp.raise_for_status()
+            return self._book_from_json(token_id, orjson.loads(resp.content))
+        except Exception as e:
+            logger.error("Failed to get order book for %.15s...: %s", token_id, e)
+            return None
 
-            asks = [
-                OrderBookLevel(
-                    price=float(level.price),
-                    size=float(level.size),
-                )
-                for level in book_data.asks
-            ]
+    async def get_order_book_async(self, token_id: str) -> Optional[OrderBook]:
+        """Fetch an order book on the event loop over the pooled async client."""
+        try:
+            resp = await self.ahttp.get(self._book_url, params={"token_id": token_id})
+            resp.raise_for_status()
+            return self._book_from_json(token_id, orjson.loads(resp.content))
+        except Exception as e:
+            logger.error("Failed to get order book for %.15s...: %s", token_id, e)
+            return None
 
-            bids.sort(key=lambda x: x.price, reverse=True)
-            asks.sort(key=lambda x: x.price)
+    def get_order_books(self, token_ids: list[str]) -> dict[str, OrderBook]:
+        """Fetch many order books in one POST /books request, keyed by token id."""
+        if not token_ids:
+            return {}
+        try:
+            resp = self._http.post("/books", json=[{"token_id": t} for t in token_ids])
+            resp.raise_for_status()
+            return self._books_from_json(orjson.loads(resp.content))
+        except Exception as e:
+            logger.error("Failed to batch fetch %d order books: %s", len(token_ids), e)
+            return {}
 
-            return OrderBook(token_id=token_id, bids=bids, asks=asks)
+    async def get_order_books_async(self, token_ids: list[str]) -> dict[str, OrderBook]:
+        """Async variant of get_order_books."""
+        if not token_ids:
+            return {}
+        try:
+            resp = await self.ahttp.post(self._books_url, json=[{"token_id": t} for t in token_ids])
+            resp.raise_for_status()
+            return self._books_from_json(orjson.loads(resp.content))
         except Exception as e:
-            logger.error(f"Failed to get order book for {token_id[:15]}...: {e}")
+            logger.error("Failed to batch fetch %d order books: %s", len(token_ids), e)
+            return {}
+
+    @classmethod
+    def _books_from_json(cls, books_data: list[dict]) -> dict[str, OrderBook]:
+        return {
+            book_data["asset_id"]: cls._book_from_json(book_data["asset_id"], book_data)
+            for book_data in books_data
+            if book_data.get("asset_id")
+        }
+
+    @staticmethod
+    def _book_from_json(token_id: str, book_data: dict) -> OrderBook:
+        bids = _parse_levels(book_data.get("bids", []))
+        asks = _parse_levels(book_data.get("asks", []))
+        return OrderBook(
+            token_id=token_id,
+            bids=_book_order(bids, descending=True),
+            asks=_book_order(asks, descending=False),
+        )
+
+    async def get_market_with_books_async(self, event_slug: str) -> Optional[Market]:
+        """Async variant of get_market_with_books.
+
+        All YES and NO books come from one batched request. Any the batch
+        misses are fetched concurrently, one request per token.
+        """
+        market = await asyncio.to_thread(self.get_market_by_slug, event_slug)
+        if not market:
             return None
 
+        targets = self._book_targets(market)
+        books = await self.get_order_books_async([token_id for _, _, token_id in targets])
+        missing = [token_id for _, _, token_id in targets if token_id not in books]
+        if missing:
+            fetched = await asyncio.gather(
+                *(self.get_order_book_async(token_id) for token_id in missing),
+                return_exceptions=True,
+            )
+            for token_id, book in zip(missing, fetched):
+                if isinstance(book, BaseException):
+                    logger.error("Failed to get order book for %.15s...: %s", token_id, book)
+                    book = None
+                books[token_id] = book
+
+        for outcome, attr, token_id in targets:
+            setattr(outcome, attr, books.get(token_id))
+
+        return market
+
+    async def subscribe_books(self, token_ids: list[str], queue: asyncio.Queue):
+        """Stream order book updates for token_ids into queue.
+
+        Subscribes to the CLOB market WebSocket channel. Every `book`
+        snapshot or `price_change` event puts the token's updated OrderBook
+        on the queue. Runs until the connection drops or the task is
+        cancelled - callers should fall back to REST when it is not running.
+        """
+        books: dict[str, OrderBook] = {}
+        async with websockets.connect(CLOB_WS_URL) as ws:
+            await ws.send(orjson.dumps({"assets_ids": token_ids, "type": "market"}).decode())
+            logger.info("Subscribed to %d order books over WebSocket", len(token_ids))
+
+            async for raw in ws:
+                try:
+                    payload = orjson.loads(raw)
+                except (orjson.JSONDecodeError, TypeError):
+                    continue  # Keep-alive frames such as PONG
+
+                events = payload if isinstance(payload, list) else [payload]
+                for event in events:
+                    for book in self._apply_book_event(event, books):
+                        await queue.put(book)
+
+    @staticmethod
+    def _apply_book_event(event: dict, books: dict[str, OrderBook]) -> list[OrderBook]:
+        """Apply one WebSocket market event to books, returning updated books."""
+        event_type = event.get("event_type")
+
+        if event_type == "book":
+            token_id = event.get("asset_id", "")
+            bids = _parse_levels(event.get("bids", event.get("buys", [])))
+            asks = _parse_levels(event.get("asks", event.get("sells", [])))
+            books[token_id] = OrderBook(
+                token_id=token_id,
+                bids=_book_order(bids, descending=True),
+                asks=_book_order(asks, descending=False),
+            )
+            return [books[token_id]]
+
+        if event_type == "price_change":
+            # Newer payloads carry a per-change asset_id, older ones a single
+            # top-level asset_id with a "changes" list
+            changes = event.get("price_changes") or [
+                dict(change, asset_id=event.get("asset_id", ""))
+                for change in event.get("changes", [])
+            ]
+            updated = {}
+            for change in changes:
+                book = books.get(change.get("asset_id", ""))
+                if not book:
+                    continue  # No snapshot yet - wait for the next book event
+                price = float(change["price"])
+                size = float(change["size"])
+                is_bid = change.get("side") == BUY
+                levels = book.bids if is_bid else book.asks
+                levels[:] = [level for level in levels if level.price != price]
+                if size > 0:
+                    levels.append(OrderBookLevel(price=price, size=size))
+                    levels.sort(key=_PRICE, reverse=is_bid)
+                updated[book.token_id] = book
+            for book in updated.values():
+                book.refresh()
+            return list(updated.values())
+
+        return []
+
     def get_market_with_books(self, event_slug: str) -> Optional[Market]:
         """Fetch market via Gamma API with order books for all outcomes."""
         market = self.get_market_by_slug(event_slug)
         if not market:
             return None
 
+        targets = self._book_targets(market)
+        if not targets:
+            return market
+
+        # One batched request snapshots every book at the same server tick
+        books = self.get_order_books([token_id for _, _, token_id in targets])
+        missing = [token_id for _, _, token_id in targets if token_id not in books]
+        if missing:
+            # Book requests are independent - fetch them in parallel
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                books.update(zip(missing, executor.map(self.get_order_book, missing)))
+        for outcome, attr, token_id in targets:
+            setattr(outcome, attr, books.get(token_id))
+
+        return market
+
+    @staticmethod
+    def _book_targets(market: Market) -> list[tuple[MarketOutcome, str, str]]:
+        """List (outcome, book attribute, token id) for every YES/NO token."""
+        targets = []
         for outcome in market.outcomes:
             if outcome.token_id:
-                outcome.order_book = self.get_order_book(outcome.token_id)
+                targets.append((outcome, "order_book", outcome.token_id))
             if outcome.no_token_id:
-                outcome.no_order_book = self.get_order_book(outcome.no_token_id)
-
-        return market
+                targets.append((outcome, "no_order_book", outcome.no_token_id))
+        return targets
 
     def buy_market_order(self, token_id, amount_usd, dry_run=True):
         if dry_run:
-            logger.info(f"[DRY RUN] Would BUY ${amount_usd} of token {token_id[:15]}...")
+            logger.info("[DRY RUN] Would BUY $%s of token %.15s...", amount_usd, token_id)
             return TradeResult(success=True, order_id="dry-run")
 
         try:
@@ -235,7 +543,7 @@ class PolymarketClient:
             )
             response = self.client.post_order(order, OrderType.FOK)
             order_id = response.get("orderID", "")
-            logger.info(f"Market buy order submitted: {order_id}")
+            logger.info("Market buy order submitted: %s", order_id)
             return TradeResult(
                 success=True,
                 order_id=order_id,
@@ -243,7 +551,7 @@ class PolymarketClient:
                 filled_price=float(response.get("matchedPrice", 0)),
             )
         except Exception as e:
-            logger.error(f"Market buy failed: {e}")
+            logger.error("Market buy failed: %s", e)
             return TradeResult(success=False, error=str(e))
 
     def discover_tsa_market(self, target_date=None):
@@ -252,38 +560,29 @@ class PolymarketClient:
         Slug pattern is: number-of-tsa-passengers-{month}-{day}
         Verifies the market exists on Gamma API before returning.
         """
-        from datetime import date as _date
         if target_date is None:
-            target_date = _date.today()
+            target_date = date.today()
 
-        month_name = target_date.strftime('%B').lower()
-        day = target_date.day
-        slug = f"number-of-tsa-passengers-{month_name}-{day}"
+        slug = _build_tsa_slug(target_date)
 
         try:
-            resp = httpx.get(
-                f'{GAMMA_API_URL}/events',
-                params={'slug': slug},
-                timeout=15.0,
-            )
-            resp.raise_for_status()
-            events = resp.json()
+            event = self._get_event(slug)
 
-            if events:
-                event_title = events[0].get("title", "")
-                logger.info(f"Verified TSA market exists: {slug} ({event_title})")
+            if event:
+                event_title = event.get("title", "")
+                logger.info("Verified TSA market exists: %s (%s)", slug, event_title)
                 return slug
 
-            logger.warning(f"TSA market not found for slug: {slug}")
+            logger.warning("TSA market not found for slug: %s", slug)
             return None
 
         except Exception as e:
-            logger.error(f"Failed to verify TSA market {slug}: {e}")
+            logger.error("Failed to verify TSA market %s: %s", slug, e)
             return None
 
     def get_balance_info(self) -> dict:
         try:
             return self.client.get_balance_allowance()
         except Exception as e:
-            logger.error(f"Failed to get balance info: {e}")
+            logger.error("Failed to get balance info: %s", e)
             return {}
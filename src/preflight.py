@@ -1,9 +1,30 @@
 """Pre-flight verification. Run: python -m src.preflight"""
 import sys, inspect, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+# (outcome title, bracket, expected match)
+BRACKET_MATCH_CASES = [("1.5M - 1.7M","1.5M-1.7M",True),("1.7M-1.9M","1.7M-1.9M",True),
+    ("<1.5M","<1.5M",True),(">2.3M",">2.3M",True),
+    ("Under 1.5M","<1.5M",True),("Over 2.3M",">2.3M",True),
+    ("2.1M - 2.3M",">2.3M",False),(">2.3M","2.1M-2.3M",False),
+    ("<1.5M","1.5M-1.7M",False),("1.5M-1.7M","1.7M-1.9M",False)]
+# (passenger count, expected bracket)
+BRACKET_ASSIGNMENT_CASES = [(1400000,"<1.5M"),(1600000,"1.5M-1.7M"),(1800000,"1.7M-1.9M"),
+    (2000000,"1.9M-2.1M"),(2200000,"2.1M-2.3M"),(2400000,">2.3M")]
+# (table order, row dates top-down) - parse_latest must pick 1/3/2026 from each
+TSA_ORDER_CASES = [("newest-first",["1/3/2026","1/2/2026","1/1/2026"]),
+    ("oldest-first",["1/1/2026","1/2/2026","1/3/2026"])]
+
+def _tsa_table(dates):
+    rows = "".join(f"<tr><td>{d}</td><td>2,000,000</td></tr>" for d in dates)
+    return f"<table><tr><th>Date</th><th>Numbers</th></tr>{rows}</table>"
 
 def main():
+    from src.report import Reporter
     errors, warnings = [], []
-    p = print
+    out = Reporter()
+    p = out.p
     p("=" * 60)
     p("  PRE-FLIGHT VERIFICATION")
     p("=" * 60)
@@ -12,24 +33,29 @@ def main():
     try:
         from src.config import Settings
         from src.tsa_scraper import TSAScraper, TSADataPoint, DEFAULT_HEADERS
-        from src.polymarket import PolymarketClient, MarketOutcome
+        from src.polymarket import PolymarketClient, MarketOutcome, _build_tsa_slug
         from src.trading import TradingEngine, get_polymarket_bracket
-        from src.main import TradingBot
+        from src.main import TradingBot, HOT_WINDOW_START, HOT_WINDOW_END
         p("[OK] All imports")
     except Exception as e:
-        p(f"[FAIL] {e}"); sys.exit(1)
+        p(f"[FAIL] {e}"); out.flush(); sys.exit(1)
 
     p()
     p("--- STEP 2: Code Paths ---")
+    from datetime import date
     s = inspect.getsource(PolymarketClient.discover_tsa_market)
-    if "number-of-tsa-passengers" in s: p("[OK] slug construction")
+    if "_build_tsa_slug" in s and _build_tsa_slug(date(2026, 2, 3)) == "number-of-tsa-passengers-february-3":
+        p("[OK] slug construction")
     else: errors.append("no slug construction")
     if "text search" in s: errors.append("old search code")
     else: p("[OK] no old search")
-    s = inspect.getsource(TradingBot._get_poll_interval)
-    if "return 1" in s: p("[OK] 1s hot window")
-    elif "return 3" in s: warnings.append("3s not 1s")
-    if "time(8, 0)" in s and "time(9, 30)" in s: p("[OK] 8:00-9:30 ET")
+    interval = TradingBot._get_poll_interval(SimpleNamespace(_in_hot_window=lambda: True, _poll_interval=60))
+    if interval == 1: p("[OK] 1s hot window")
+    else: warnings.append(f"{interval}s not 1s")
+    s = inspect.getsource(TradingBot._in_hot_window)
+    from datetime import time as dtime
+    if (HOT_WINDOW_START, HOT_WINDOW_END) == (dtime(8, 0), dtime(9, 30)) and "HOT_WINDOW_START" in s:
+        p("[OK] 8:00-9:30 ET")
     else: errors.append("window times")
     if hasattr(TSAScraper, "fetch_if_changed"):
         s = inspect.getsource(TSAScraper.fetch_if_changed)
@@ -41,7 +67,7 @@ def main():
     else: errors.append("not using fetch_if_changed")
     if hasattr(TradingEngine, "_analyze_wrong_outcome"): p("[OK] BUY_NO")
     else: errors.append("no BUY_NO")
-    s = inspect.getsource(TradingEngine.execute_signals)
+    s = inspect.getsource(TradingEngine._submit)
     if "BUY_YES" in s and "no_token_id" in s: p("[OK] YES/NO routing")
     else: errors.append("token routing")
     s = inspect.getsource(TradingEngine._brackets_match)
@@ -55,19 +81,16 @@ def main():
     class FC:
         max_trade_size_usd=50; max_buy_price=0.95; min_edge=0.05; dry_run=True
     eng = TradingEngine(None, FC())
-    cases = [("1.5M - 1.7M","1.5M-1.7M",True),("1.7M-1.9M","1.7M-1.9M",True),
-        ("<1.5M","<1.5M",True),(">2.3M",">2.3M",True),
-        ("Under 1.5M","<1.5M",True),("Over 2.3M",">2.3M",True),
-        ("2.1M - 2.3M",">2.3M",False),(">2.3M","2.1M-2.3M",False),
-        ("<1.5M","1.5M-1.7M",False),("1.5M-1.7M","1.7M-1.9M",False)]
-    ok = all(eng._brackets_match(o,b)==e for o,b,e in cases)
-    p(f"[OK] {len(cases)} bracket tests" if ok else "[FAIL] bracket tests")
+    ok = all(eng._brackets_match(o,b)==e for o,b,e in BRACKET_MATCH_CASES)
+    p(f"[OK] {len(BRACKET_MATCH_CASES)} bracket tests" if ok else "[FAIL] bracket tests")
     if not ok: errors.append("bracket tests")
-    bt = [(1400000,"<1.5M"),(1600000,"1.5M-1.7M"),(1800000,"1.7M-1.9M"),
-        (2000000,"1.9M-2.1M"),(2200000,"2.1M-2.3M"),(2400000,">2.3M")]
-    ok = all(get_polymarket_bracket(c)==e for c,e in bt)
-    p(f"[OK] {len(bt)} assignments" if ok else "[FAIL] assignments")
+    ok = all(get_polymarket_bracket(c)==e for c,e in BRACKET_ASSIGNMENT_CASES)
+    p(f"[OK] {len(BRACKET_ASSIGNMENT_CASES)} assignments" if ok else "[FAIL] assignments")
     if not ok: errors.append("bracket assignments")
+    sc = TSAScraper()
+    ok = all(sc.parse_latest(_tsa_table(ds)).date == date(2026, 1, 3) for _, ds in TSA_ORDER_CASES)
+    p(f"[OK] {len(TSA_ORDER_CASES)} row-order tests" if ok else "[FAIL] row-order tests")
+    if not ok: errors.append("TSA row order")
 
     p()
     p("--- STEP 4: Config ---")
@@ -78,21 +101,21 @@ def main():
 
     p()
     p("--- STEP 5: Timezone ---")
-    import pytz
-    from datetime import datetime, time as dtime, date, timedelta
-    et = pytz.timezone("America/New_York")
-    now = datetime.now(et)
+    from datetime import datetime, date, timedelta
+    from src.main import ET_TIMEZONE
+    now = datetime.now(ET_TIMEZONE)
     hms = str(now.hour) + ":" + str(now.minute).zfill(2) + ":" + str(now.second).zfill(2)
-    p(f"[OK] ET={hms}  weekday={now.weekday()<5}  hot={dtime(8,0)<=now.time()<=dtime(9,30)}")
+    p(f"[OK] ET={hms}  weekday={now.weekday()<5}  hot={HOT_WINDOW_START<=now.time()<=HOT_WINDOW_END}")
 
+    # Flush before the network steps so progress shows while they run
+    out.flush()
     p()
     p("--- STEP 6: Connectivity ---")
     async def test_conn():
         async with TSAScraper() as sc:
             html = await sc.fetch_page()
-            data = sc.parse_html(html)
-            if data:
-                d = data[0]
+            d = sc.parse_latest(html)
+            if d:
                 p(f"[OK] TSA.gov: {d.date} - {d.formatted_count}")
             else: errors.append("TSA: no data")
             html2 = await sc.fetch_if_changed()
@@ -101,25 +124,31 @@ def main():
     asyncio.run(test_conn())
 
     import httpx
+    # One keep-alive client for every Gamma probe
+    gamma = httpx.Client(base_url="https://gamma-api.polymarket.com", http2=True, timeout=15.0)
     try:
-        r = httpx.get("https://gamma-api.polymarket.com/events", params={"slug": "test"}, timeout=15.0)
+        r = gamma.get("/events", params={"slug": "test"})
         p(f"[OK] Gamma API ({r.status_code})")
     except Exception as e: errors.append(f"Gamma: {e}")
 
+    out.flush()
     p()
     p("--- STEP 7: Auto-Discovery ---")
-    for off, lbl in [(0,"Today"),(1,"Tomorrow")]:
-        d = date.today() + timedelta(days=off)
-        mn = d.strftime("%B").lower()
-        sl = f"number-of-tsa-passengers-{mn}-{d.day}"
-        try:
-            r = httpx.get("https://gamma-api.polymarket.com/events", params={"slug": sl}, timeout=15.0)
-            ev = r.json()
-            if ev: p(f"[OK] {lbl}: {sl}")
-            else:
-                warnings.append(f"{lbl}: {sl} not found")
-                p(f"[WARN] {lbl}: {sl} not found")
-        except Exception as e: warnings.append(f"{lbl}: {e}")
+    def lookup(d):
+        sl = _build_tsa_slug(d)
+        try: return sl, gamma.get("/events", params={"slug": sl}).json(), None
+        except Exception as e: return sl, None, e
+    days = [("Today", date.today()), ("Tomorrow", date.today() + timedelta(days=1))]
+    # Lookups are independent - one round trip for both instead of one each
+    with ThreadPoolExecutor(max_workers=len(days)) as ex:
+        found = list(ex.map(lookup, [d for _, d in days]))
+    for (lbl, _), (sl, ev, err) in zip(days, found):
+        if err: warnings.append(f"{lbl}: {err}")
+        elif ev: p(f"[OK] {lbl}: {sl}")
+        else:
+            warnings.append(f"{lbl}: {sl} not found")
+            p(f"[WARN] {lbl}: {sl} not found")
+    gamma.close()
 
     p()
     p("=" * 60)
@@ -140,6 +169,7 @@ def main():
         p()
         p("  No errors. Review warnings.")
     p("")
+    out.flush()
     sys.exit(1 if errors else 0)
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+"""
+Buffered report output for the command-line checks (preflight, simulate,
+connectivity_test).
+"""
+
+import sys
+
+
+class Reporter:
+    """Collects report lines and writes them to stdout in one call per flush.
+
+    Calling the reporter adds a line too, so it can stand in for print as a
+    probe's log function. Concurrent probes each get their own reporter and
+    are flushed in order, so their output doesn't interleave.
+    """
+
+    def __init__(self):
+        self._buf: list[str] = []
+
+    def p(self, line: str = ""):
+        self._buf.append(str(line))
+
+    __call__ = p
+
+    def flush(self):
+        if self._buf:
+            sys.stdout.write("\n".join(self._buf) + "\n")
+            sys.stdout.flush()
+            self._buf.clear()
@@ -16,12 +16,14 @@ import asyncio
 import json
 import logging
 import sys
+from operator import attrgetter
 
 # Setup path for direct execution
 if __name__ == "__main__":
     sys.path.insert(0, ".")
 
 from src.config import load_settings, print_config
+from src.report import Reporter
 from src.tsa_scraper import TSAScraper
 from src.trading import TradingEngine, get_polymarket_bracket
 
@@ -33,17 +35,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Flushed at every section header so slow network steps still show progress
+out = Reporter()
+
 
 def print_header(text):
-    print()
-    print("=" * 60)
-    print(f"  {text}")
-    print("=" * 60)
+    out.p()
+    out.p("=" * 60)
+    out.p(f"  {text}")
+    out.p("=" * 60)
+    out.flush()
 
 
 def print_section(text):
-    print()
-    print(f"--- {text} ---")
+    out.p()
+    out.p(f"--- {text} ---")
+    out.flush()
 
 
 async def run_simulation():
@@ -60,42 +67,60 @@ async def run_simulation():
     if not settings.polymarket_private_key:
         errors.append("POLYMARKET_PRIVATE_KEY is not set")
     if not settings.target_market_slug:
-        print("[INFO] TARGET_MARKET_SLUG not set - will use auto-discovery")
+        out.p("[INFO] TARGET_MARKET_SLUG not set - will use auto-discovery")
     if settings.dry_run:
-        print("[OK] Dry run mode is ON (safe)")
+        out.p("[OK] Dry run mode is ON (safe)")
     else:
         warnings.append("DRY_RUN is OFF - real trades will execute!")
 
+    def connect_polymarket():
+        """Return (client, balance, error); client is None if connect failed."""
+        from src.polymarket import PolymarketClient
+        client = None
+        try:
+            client = PolymarketClient(settings.get_polymarket_config())
+            client.connect()
+        except Exception as e:
+            if client:
+                client.close()
+            return None, None, e
+        try:
+            return client, client.get_balance_info(), None
+        except Exception as e:
+            return client, None, e
+
+    # Steps 2 and 3 talk to different hosts - connect to Polymarket and read
+    # the balance in the background while TSA.gov is fetched
+    connect_task = None
+    if settings.polymarket_private_key:
+        connect_task = asyncio.create_task(asyncio.to_thread(connect_polymarket))
+
     # STEP 2: TSA Scraper
     print_section("STEP 2: TSA Data Fetch")
-    tsa_data = None
     async with TSAScraper() as scraper:
-        all_data = await scraper.get_all_data()
-        if all_data:
-            tsa_data = all_data[0]
-            print(f"[OK] Fetched {len(all_data)} data points")
-            print(f"     Latest: {tsa_data.date} - {tsa_data.formatted_count} passengers")
+        tsa_data = await scraper.get_latest_data()
+        if tsa_data:
+            out.p(f"[OK] Latest: {tsa_data.date} - {tsa_data.formatted_count} passengers")
             bracket = get_polymarket_bracket(tsa_data.passenger_count)
-            print(f"     Bracket: {bracket}")
+            out.p(f"     Bracket: {bracket}")
         else:
             errors.append("Failed to fetch TSA data")
 
     # STEP 3: Polymarket Connection
     print_section("STEP 3: Polymarket Connection")
     poly_client = None
-    if settings.polymarket_private_key:
+    if connect_task:
         try:
-            from src.polymarket import PolymarketClient
-            config = settings.get_polymarket_config()
-            poly_client = PolymarketClient(config)
-            poly_client.connect()
-            print("[OK] Connected to Polymarket CLOB")
-
-            try:
-                balance_info = poly_client.get_balance_info()
-                print(f"[OK] Balance/Allowance: {balance_info}")
-            except Exception as e:
-                warnings.append(f"Could not fetch balance: {e}")
+            poly_client, balance_info, connect_error = await connect_task
+            if not poly_client:
+                errors.append(f"Failed to connect to Polymarket: {connect_error}")
+            else:
+                out.p("[OK] Connected to Polymarket CLOB")
+
+                if connect_error:
+                    warnings.append(f"Could not fetch balance: {connect_error}")
+                else:
+                    out.p(f"[OK] Balance/Allowance: {balance_info}")
         except Exception as e:
             errors.append(f"Failed to connect to Polymarket: {e}")
     else:
@@ -105,9 +130,9 @@ async def run_simulation():
     # Always test auto-discovery regardless of TARGET_MARKET_SLUG setting
     if poly_client and tsa_data:
         print_section("STEP 3b: Auto-Discovery Test")
-        test_slug = poly_client.discover_tsa_market(tsa_data.date)
+        test_slug = await asyncio.to_thread(poly_client.discover_tsa_market, tsa_data.date)
         if test_slug:
-            print(f"[OK] Auto-discovery works: {test_slug}")
+            out.p(f"[OK] Auto-discovery works: {test_slug}")
         else:
             errors.append(f"Auto-discovery FAILED for {tsa_data.date} - this must work for live trading without TARGET_MARKET_SLUG")
 
@@ -118,39 +143,36 @@ async def run_simulation():
     if poly_client:
         try:
             if not market_slug:
-                print("[INFO] Attempting auto-discovery of TSA market...")
-                if tsa_data:
-                    market_slug = poly_client.discover_tsa_market(tsa_data.date)
-                else:
-                    market_slug = poly_client.discover_tsa_market()
+                out.p("[INFO] Attempting auto-discovery of TSA market...")
+                market_slug = await asyncio.to_thread(
+                    poly_client.discover_tsa_market, tsa_data.date if tsa_data else None
+                )
                 if market_slug:
-                    print(f"[OK] Auto-discovered market slug: {market_slug}")
+                    out.p(f"[OK] Auto-discovered market slug: {market_slug}")
                 else:
                     errors.append("Auto-discovery failed - no TSA market found for today")
             if market_slug:
-                market = poly_client.get_market_with_books(market_slug)
+                market = await poly_client.get_market_with_books_async(market_slug)
             if market:
-                print(f"[OK] Found market: {market.question}")
-                print(f"     Outcomes: {len(market.outcomes)}")
-                print()
+                out.p(f"[OK] Found market: {market.question}")
+                out.p(f"     Outcomes: {len(market.outcomes)}")
+                out.p()
                 for outcome in market.outcomes:
                     book = outcome.order_book
                     if book:
                         bid_str = f"bid={book.best_bid:.4f}" if book.best_bid else "bid=none"
                         ask_str = f"ask={book.best_ask:.4f}" if book.best_ask else "ask=none"
                         spread_str = f"spread={book.spread:.4f}" if book.spread else ""
-                        bid_depth = sum(l.size for l in book.bids)
-                        ask_depth = sum(l.size for l in book.asks)
-                        print(f"     {outcome.outcome:12s}  YES: {bid_str}  {ask_str}  {spread_str}")
-                        print(f"                   bid_depth={bid_depth:.0f}  ask_depth={ask_depth:.0f}")
+                        out.p(f"     {outcome.outcome:12s}  YES: {bid_str}  {ask_str}  {spread_str}")
+                        out.p(f"                   bid_depth={book.bid_depth:.0f}  ask_depth={book.ask_depth:.0f}")
                     else:
-                        print(f"     {outcome.outcome:12s}  YES: [no order book]")
+                        out.p(f"     {outcome.outcome:12s}  YES: [no order book]")
 
                     no_book = outcome.no_order_book
                     if no_book:
                         no_bid = f"bid={no_book.best_bid:.4f}" if no_book.best_bid else "bid=none"
                         no_ask = f"ask={no_book.best_ask:.4f}" if no_book.best_ask else "ask=none"
-                        print(f"                   NO:  {no_bid}  {no_ask}")
+                        out.p(f"                   NO:  {no_bid}  {no_ask}")
             else:
                 errors.append(f"Market not found: {market_slug}")
         except Exception as e:
@@ -159,32 +181,32 @@ async def run_simulation():
     # STEP 5: Trading Simulation
     print_section("STEP 5: Trading Simulation")
     if tsa_data and market and poly_client:
-        trading_config = settings.get_trading_config()
-        trading_config.dry_run = True  # Force dry run
+        # Force dry run on a copy - the cached config is shared
+        trading_config = settings.get_trading_config().model_copy(update={"dry_run": True})
 
         engine = TradingEngine(poly_client, trading_config)
         decision = engine.analyze_market(tsa_data, market)
 
-        print(f"     TSA Count: {tsa_data.formatted_count}")
-        print(f"     Correct bracket: {decision.correct_bracket}")
-        print(f"     Signals generated: {len(decision.signals)}")
-        print()
+        out.p(f"     TSA Count: {tsa_data.formatted_count}")
+        out.p(f"     Correct bracket: {decision.correct_bracket}")
+        out.p(f"     Signals generated: {len(decision.signals)}")
+        out.p()
 
         # Separate HOLDs from actionable signals, rank by edge
         holds = [s for s in decision.signals if s.action == "HOLD"]
         actionable = [s for s in decision.signals if s.action != "HOLD"]
-        actionable.sort(key=lambda s: s.edge, reverse=True)
+        actionable.sort(key=attrgetter("edge"), reverse=True)
 
         if actionable:
             budget = trading_config.max_trade_size_usd
             sim_spent = 0.0
             sim_profit = 0.0
-            print(f"     Budget: ${budget:.2f}")
-            print()
+            out.p(f"     Budget: ${budget:.2f}")
+            out.p()
             for signal in actionable:
                 remaining = budget - sim_spent
                 if remaining < 1.0:
-                    print(f"     --- SKIP '{signal.outcome.outcome}' (budget exhausted)")
+                    out.p(f"     --- SKIP '{signal.outcome.outcome}' (budget exhausted)")
                     continue
                 alloc = min(signal.size_usd, remaining)
                 sim_spent += alloc
@@ -194,55 +216,59 @@ async def run_simulation():
                 payout = shares * 1.0
                 profit = payout - alloc
                 sim_profit += profit
-                print(f"     >>> WOULD {signal.action} on '{signal.outcome.outcome}'")
-                print(f"         Price: {signal.target_price:.4f}")
-                print(f"         Spend: ${alloc:.2f}  (liquidity: ${signal.size_usd:.2f})")
-                print(f"         Edge: {signal.edge:.1%}")
-                print(f"         Profit: ${profit:.2f}  (${alloc:.2f} -> ${payout:.2f})")
-            print()
-            print(f"     Total would spend: ${sim_spent:.2f} / ${budget:.2f}")
-            print(f"     Projected profit:  ${sim_profit:.2f}  ({sim_profit/sim_spent*100:.1f}% return)" if sim_spent > 0 else "")
+                out.p(f"     >>> WOULD {signal.action} on '{signal.outcome.outcome}'")
+                out.p(f"         Price: {signal.target_price:.4f}")
+                out.p(f"         Spend: ${alloc:.2f}  (liquidity: ${signal.size_usd:.2f})")
+                out.p(f"         Edge: {signal.edge:.1%}")
+                out.p(f"         Profit: ${profit:.2f}  (${alloc:.2f} -> ${payout:.2f})")
+            out.p()
+            out.p(f"     Total would spend: ${sim_spent:.2f} / ${budget:.2f}")
+            out.p(f"     Projected profit:  ${sim_profit:.2f}  ({sim_profit/sim_spent*100:.1f}% return)" if sim_spent > 0 else "")
 
         for signal in holds:
-            print(f"     --- HOLD on '{signal.outcome.outcome}'")
-            print(f"         Reason: {signal.reason}")
+            out.p(f"     --- HOLD on '{signal.outcome.outcome}'")
+            out.p(f"         Reason: {signal.reason}")
 
         if not actionable and not holds:
-            print("     No trading opportunities found")
+            out.p("     No trading opportunities found")
             warnings.append("No signals generated")
     else:
         missing = []
         if not tsa_data: missing.append("TSA data")
         if not market: missing.append("market")
         if not poly_client: missing.append("Polymarket connection")
-        print(f"     Cannot simulate - missing: {', '.join(missing)}")
+        out.p(f"     Cannot simulate - missing: {', '.join(missing)}")
 
     # STEP 6: Summary
     print_header("SIMULATION RESULTS")
 
     if errors:
-        print()
-        print("ERRORS (must fix before live run):")
+        out.p()
+        out.p("ERRORS (must fix before live run):")
         for e in errors:
-            print(f"  [X] {e}")
+            out.p(f"  [X] {e}")
 
     if warnings:
-        print()
-        print("WARNINGS:")
+        out.p()
+        out.p("WARNINGS:")
         for w in warnings:
-            print(f"  [!] {w}")
+            out.p(f"  [!] {w}")
 
     if not errors and not warnings:
-        print()
-        print("  ALL CHECKS PASSED")
-        print("  The bot is ready for live trading.")
-        print("  Set DRY_RUN=false when you want to go live.")
+        out.p()
+        out.p("  ALL CHECKS PASSED")
+        out.p("  The bot is ready for live trading.")
+        out.p("  Set DRY_RUN=false when you want to go live.")
 
     if not errors and warnings:
-        print()
-        print("  No critical errors. Review warnings above.")
+        out.p()
+        out.p("  No critical errors. Review warnings above.")
+
+    out.p()
+    out.flush()
 
-    print()
+    if poly_client:
+        await poly_client.aclose()
 
 
 if __name__ == "__main__":
@@ -6,9 +6,14 @@ Determines when and how to trade based on TSA data and market conditions.
 
 import re
 import logging
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
 from typing import Optional
 from datetime import datetime
+from time import time_ns
 
 from .tsa_scraper import TSADataPoint
 from .polymarket import PolymarketClient, Market, MarketOutcome, TradeResult
@@ -16,6 +21,17 @@ from .config import TradingConfig
 
 logger = logging.getLogger(__name__)
 
+# Bracket name normalization - compiled/built once instead of per comparison
+_NUM_RE = re.compile(r"[\d.]+")
+_STRIP_TBL = str.maketrans("", "", " ,")
+
+
+@lru_cache(maxsize=256)
+def _normalize_bracket(name: str) -> tuple[str, tuple[str, ...]]:
+    """Lowercase name, strip spaces and commas, and extract its numbers."""
+    norm = name.lower().translate(_STRIP_TBL)
+    return norm, tuple(_NUM_RE.findall(norm))
+
 
 # Polymarket TSA brackets (200K increments)
 TSA_BRACKETS = [
@@ -26,9 +42,35 @@ TSA_BRACKETS = [
     (2.1, 2.3, "2.1M-2.3M"),
     (2.3, 99.0, ">2.3M"),
 ]
-
-
-@dataclass
+# Lower edges and names of TSA_BRACKETS for bisect lookup
+_EDGES = tuple(lower for lower, _, _ in TSA_BRACKETS)
+_NAMES = tuple(name for _, _, name in TSA_BRACKETS)
+
+
+def _bracket_variants(name: str) -> frozenset[str]:
+    """Normalized spellings Polymarket uses for a TSA_BRACKETS name."""
+    nums = _NUM_RE.findall(name)
+    if name.startswith("<"):
+        words = ("<", "under", "below", "lessthan")
+        return frozenset(f"{w}{nums[0]}{m}" for w in words for m in ("m", ""))
+    if name.startswith(">"):
+        words = (">", "over", "above", "morethan")
+        return frozenset(f"{w}{nums[0]}{m}" for w in words for m in ("m", ""))
+    lo, hi = nums
+    return frozenset(
+        f"{lo}{m1}{sep}{hi}{m2}"
+        for sep in ("-", "to")
+        for m1 in ("m", "")
+        for m2 in ("m", "")
+    )
+
+
+# Bracket name -> known outcome spellings; _brackets_match checks these
+# before falling back to its general rules
+_BRACKET_VARIANTS = {name: _bracket_variants(name) for _, _, name in TSA_BRACKETS}
+
+
+@dataclass(slots=True)
 class TradeSignal:
     action: str  # "BUY_YES", "BUY_NO", "HOLD"
     outcome: MarketOutcome
@@ -38,21 +80,23 @@ class TradeSignal:
     edge: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class TradingDecision:
     tsa_data: TSADataPoint
     correct_bracket: str
     signals: list[TradeSignal]
-    timestamp: datetime
+    timestamp_ns: int  # time.time_ns() - converted only when read
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
 
 
+@lru_cache(maxsize=1024)
 def get_polymarket_bracket(passenger_count: int) -> str:
     """Map a passenger count to the Polymarket bracket name."""
-    millions = passenger_count / 1_000_000
-    for lower, upper, name in TSA_BRACKETS:
-        if lower <= millions < upper:
-            return name
-    return ">2.3M"
+    idx = bisect_right(_EDGES, passenger_count / 1_000_000) - 1
+    return _NAMES[max(idx, 0)]
 
 
 class TradingEngine:
@@ -62,48 +106,53 @@ class TradingEngine:
         self.client = polymarket_client
         self.config = config
         self._trade_history: list[TradeResult] = []
+        # Immutable copy of _trade_history, rebuilt only after it changes
+        self._history_snapshot: Optional[tuple[TradeResult, ...]] = ()
 
     def analyze_market(self, tsa_data: TSADataPoint, market: Market) -> TradingDecision:
         """Analyze market given new TSA data."""
         signals = []
         correct_bracket = get_polymarket_bracket(tsa_data.passenger_count)
 
-        logger.info(f"Analyzing market for {tsa_data.date}")
-        logger.info(f"Actual count: {tsa_data.formatted_count} ({tsa_data.millions:.3f}M)")
-        logger.info(f"Correct bracket: {correct_bracket}")
+        logger.info("Analyzing market for %s", tsa_data.date)
+        logger.info("Actual count: %s (%.3fM)", tsa_data.formatted_count, tsa_data.millions)
+        logger.info("Correct bracket: %s", correct_bracket)
 
         # Find the matching outcome
-        correct_outcome: Optional[MarketOutcome] = None
-        for outcome in market.outcomes:
-            if self._brackets_match(outcome.outcome, correct_bracket):
-                correct_outcome = outcome
-                break
+        correct_outcome = self.index_brackets(market).get(correct_bracket)
 
         if not correct_outcome:
-            logger.warning(f"Could not find outcome matching bracket: {correct_bracket}")
-            logger.warning(f"Available outcomes: {[o.outcome for o in market.outcomes]}")
+            logger.warning("Could not find outcome matching bracket: %s", correct_bracket)
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning("Available outcomes: %s", [o.outcome for o in market.outcomes])
             return TradingDecision(
                 tsa_data=tsa_data,
                 correct_bracket=correct_bracket,
                 signals=[],
-                timestamp=datetime.now(),
+                timestamp_ns=time_ns(),
             )
 
-        logger.info(f"Matched outcome: '{correct_outcome.outcome}' (token: {correct_outcome.token_id[:15]}...)")
+        logger.info("Matched outcome: '%s' (token: %.15s...)", correct_outcome.outcome, correct_outcome.token_id)
 
         # Analyze the correct outcome - BUY YES if cheap
         if correct_outcome.order_book:
             signal = self._analyze_correct_outcome(correct_outcome)
             if signal:
                 signals.append(signal)
+                if signal.action == "BUY_YES" and signal.edge >= self.config.skip_no_scan_edge:
+                    logger.info("YES edge %.1f%% - skipping wrong-outcome scan", signal.edge * 100)
+                    return TradingDecision(
+                        tsa_data=tsa_data,
+                        correct_bracket=correct_bracket,
+                        signals=signals,
+                        timestamp_ns=time_ns(),
+                    )
         else:
             logger.warning("No order book available for correct outcome")
 
         # Analyze wrong outcomes - BUY NO where stale YES bids create edge
-        for outcome in market.outcomes:
-            if outcome == correct_outcome:
-                continue
-            if not outcome.no_token_id:
+        for outcome in market.tradeable_no:
+            if outcome is correct_outcome:
                 continue
             if outcome.no_order_book:
                 signal = self._analyze_wrong_outcome(outcome)
@@ -114,26 +163,43 @@ class TradingEngine:
             tsa_data=tsa_data,
             correct_bracket=correct_bracket,
             signals=signals,
-            timestamp=datetime.now(),
+            timestamp_ns=time_ns(),
         )
 
-    def _brackets_match(self, outcome_name: str, bracket: str) -> bool:
+    def index_brackets(self, market: Market) -> dict[str, MarketOutcome]:
+        """Map each TSA bracket name to its market outcome, once per market.
+
+        Matching runs on first use and the result is kept on the market, so
+        re-analysis of a streamed market is a dict lookup.
+        """
+        if not market.bracket_index:
+            for _, _, name in TSA_BRACKETS:
+                for outcome in market.outcomes:
+                    if self._brackets_match(outcome.outcome, name):
+                        market.bracket_index[name] = outcome
+                        break
+        return market.bracket_index
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _brackets_match(outcome_name: str, bracket: str) -> bool:
         """Check if an outcome name matches a bracket.
 
-        Strict matching to prevent buying the wrong bracket.
+        Strict matching to prevent buying the wrong bracket. Results are
+        memoized - outcome names repeat across polls and markets.
         """
-        # Normalize: remove spaces, lowercase
-        o = outcome_name.lower().replace(" ", "").replace(",", "")
-        b = bracket.lower().replace(" ", "").replace(",", "")
+        # Normalize: remove spaces, lowercase. Cached - the same outcome and
+        # bracket names are compared on every analysis
+        o, o_nums = _normalize_bracket(outcome_name)
+        if o in _BRACKET_VARIANTS.get(bracket, ()):
+            return True
+        b, b_nums = _normalize_bracket(bracket)
 
         # Direct match
         if b == o:
             return True
 
-        # Extract numbers and compare - must have same count and values
-        o_nums = re.findall(r"[\d.]+", o)
-        b_nums = re.findall(r"[\d.]+", b)
-
+        # Numbers must have same count and values
         if not o_nums or not b_nums:
             return False
 
@@ -173,7 +239,7 @@ class TradingEngine:
         fair_value = 1.0
         edge = fair_value - ask_price
 
-        logger.info(f"Correct outcome '{outcome.outcome}': best_ask={ask_price:.4f}, edge={edge:.4f}")
+        logger.info("Correct outcome '%s': best_ask=%.4f, edge=%.4f", outcome.outcome, ask_price, edge)
 
         if edge < self.config.min_edge:
             return TradeSignal(
@@ -191,7 +257,9 @@ class TradingEngine:
                 edge=edge,
             )
 
-        available_liquidity = sum(level.size * level.price for level in book.asks)
+        # Only liquidity within the price cap - a market order for more
+        # would walk the book past max_buy_price
+        available_liquidity = book.ask_notional_upto(self.config.max_buy_price)
 
         if available_liquidity < 1.0:
             return TradeSignal(
@@ -201,6 +269,12 @@ class TradingEngine:
                 edge=edge,
             )
 
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Liquidity under %s: $%.2f across %d ask levels",
+                self.config.max_buy_price, available_liquidity, book.fill_depth(available_liquidity),
+            )
+
         return TradeSignal(
             action="BUY_YES",
             outcome=outcome,
@@ -224,7 +298,7 @@ class TradingEngine:
         fair_value = 1.0  # NO is worth  since this outcome is wrong
         edge = fair_value - no_ask_price
 
-        logger.info(f"Wrong outcome '{outcome.outcome}': NO best_ask={no_ask_price:.4f}, edge={edge:.4f}")
+        logger.info("Wrong outcome '%s': NO best_ask=%.4f, edge=%.4f", outcome.outcome, no_ask_price, edge)
 
         if edge < self.config.min_edge:
             return None  # Silent skip - most wrong brackets won't have edge
@@ -232,7 +306,9 @@ class TradingEngine:
         if no_ask_price > self.config.max_buy_price:
             return None
 
-        available_liquidity = sum(level.size * level.price for level in book.asks)
+        # Only liquidity within the price cap - a market order for more
+        # would walk the book past max_buy_price
+        available_liquidity = book.ask_notional_upto(self.config.max_buy_price)
 
         if available_liquidity < 1.0:
             return None
@@ -251,6 +327,13 @@ class TradingEngine:
 
         Sorts all actionable signals by edge (best first), then allocates
         from MAX_TRADE_SIZE_USD until the budget is exhausted.
+
+        Orders go out in rounds of up to MAX_CONCURRENT_ORDERS, submitted
+        concurrently. Each round is allocated from the budget left after
+        the previous round's fills, so the default of 1 is the plain
+        sequential allocation. With larger rounds, budget freed by a failed
+        order only goes to signals not yet submitted - signals in the same
+        round have already been sized without it.
         """
         results = []
         budget = self.config.max_trade_size_usd
@@ -260,48 +343,73 @@ class TradingEngine:
         actionable = []
         for signal in signals:
             if signal.action == "HOLD":
-                logger.info(f"HOLD: {signal.outcome.outcome} - {signal.reason}")
+                logger.info("HOLD: %s - %s", signal.outcome.outcome, signal.reason)
             else:
                 actionable.append(signal)
 
         # Sort by edge descending - best opportunities first
-        actionable.sort(key=lambda s: s.edge, reverse=True)
-
-        if actionable:
-            logger.info(f"Ranked {len(actionable)} opportunities by edge (budget: ${budget:.2f}):")
-            for i, s in enumerate(actionable):
-                logger.info(f"  {i+1}. {s.action} '{s.outcome.outcome}' edge={s.edge:.1%} liquidity=${s.size_usd:.2f}")
-
-        for signal in actionable:
+        actionable.sort(key=attrgetter("edge"), reverse=True)
+
+        if actionable and logger.isEnabledFor(logging.INFO):
+            log = logger.info
+            log("Ranked %d opportunities by edge (budget: $%.2f):", len(actionable), budget)
+            for i, s in enumerate(actionable, 1):
+                action, name, edge, size_usd = s.action, s.outcome.outcome, s.edge, s.size_usd
+                log("  %d. %s '%s' edge=%.1f%% liquidity=$%.2f", i, action, name, edge * 100, size_usd)
+
+        pending = actionable
+        while pending:
+            # Allocate this round's orders from the budget, best edge first
             remaining = budget - spent
-            if remaining < 1.0:
-                logger.info(f"Budget exhausted (${spent:.2f}/${budget:.2f}) - skipping remaining")
+            orders = []
+            for signal in pending[:self.config.max_concurrent_orders]:
+                if remaining < 1.0:
+                    break
+                trade_amount = min(signal.size_usd, remaining)
+                remaining -= trade_amount
+                orders.append((signal, trade_amount))
+            pending = pending[len(orders):]
+            if not orders:
+                logger.info("Budget exhausted ($%.2f/$%.2f) - skipping remaining", spent, budget)
                 break
 
-            trade_amount = min(signal.size_usd, remaining)
-            token_id = signal.outcome.token_id if signal.action == "BUY_YES" else signal.outcome.no_token_id
+            for signal, trade_amount in orders:
+                logger.info(
+                    "EXECUTING: %s on '%s' for $%.2f @ %.3f (edge: %.1f%%)",
+                    signal.action, signal.outcome.outcome, trade_amount, signal.target_price, signal.edge * 100,
+                )
 
-            logger.info(
-                f"EXECUTING: {signal.action} on '{signal.outcome.outcome}' "
-                f"for ${trade_amount:.2f} @ {signal.target_price:.3f} (edge: {signal.edge:.1%})"
-            )
-
-            result = self.client.buy_market_order(
-                token_id=token_id,
-                amount_usd=trade_amount,
-                dry_run=self.config.dry_run,
-            )
-
-            results.append(result)
-            self._trade_history.append(result)
-
-            if result.success:
-                spent += trade_amount
-                logger.info(f"Trade executed: {result.order_id} (spent: ${spent:.2f}/${budget:.2f})")
+            if len(orders) == 1:
+                round_results = [self._submit(*orders[0])]
             else:
-                logger.error(f"Trade failed: {result.error}")
+                # Orders are independent - submit them in parallel so stale
+                # quotes aren't lost to round trips for earlier orders
+                with ThreadPoolExecutor(max_workers=len(orders)) as executor:
+                    round_results = list(executor.map(lambda order: self._submit(*order), orders))
+
+            for (signal, trade_amount), result in zip(orders, round_results):
+                results.append(result)
+                self._trade_history.append(result)
+                self._history_snapshot = None
+
+                if result.success:
+                    spent += trade_amount
+                    logger.info("Trade executed: %s (spent: $%.2f/$%.2f)", result.order_id, spent, budget)
+                else:
+                    logger.error("Trade failed: %s", result.error)
 
         return results
 
-    def get_trade_history(self) -> list[TradeResult]:
-        return self._trade_history.copy()
+    def _submit(self, signal: TradeSignal, trade_amount: float) -> TradeResult:
+        """Submit one market buy for a BUY_YES or BUY_NO signal."""
+        token_id = signal.outcome.token_id if signal.action == "BUY_YES" else signal.outcome.no_token_id
+        return self.client.buy_market_order(
+            token_id=token_id,
+            amount_usd=trade_amount,
+            dry_run=self.config.dry_run,
+        )
+
+    def get_trade_history(self) -> tuple[TradeResult, ...]:
+        if self._history_snapshot is None:
+            self._history_snapshot = tuple(self._trade_history)
+        return self._history_snapshot
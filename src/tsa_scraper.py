@@ -13,18 +13,45 @@ Optimizations:
 import asyncio
 import logging
 from dataclasses import dataclass
-from datetime import datetime, date
+from datetime import date
+from operator import attrgetter
 from typing import Optional
 import re
+import ssl
 import time
 
 import httpx
-from bs4 import BeautifulSoup
+
+try:
+    # C HTML parser - far faster than BeautifulSoup on the ~150KB page
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
 TSA_URL = "https://www.tsa.gov/travel/passenger-volumes"
 
+# Strips thousands separators and any other non-digits from counts
+_NON_DIGITS_RE = re.compile(r"[^\d]")
+
+# Row dates: "10/13/2025" / "10/13/25" (the TSA table) or "October 13, 2025"
+_DATE_NUMERIC_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})")
+_DATE_TEXT_RE = re.compile(r"([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})")
+_MONTHS = {
+    name: number
+    for number, full in enumerate(
+        ("january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"),
+        start=1,
+    )
+    for name in (full, full[:3])
+}
+
+# Built once - SSL context creation dominates httpx client construction
+_SSL_CTX = ssl.create_default_context()
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -34,7 +61,7 @@ DEFAULT_HEADERS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class TSADataPoint:
     """Represents a single day TSA passenger count."""
     date: date
@@ -64,26 +91,33 @@ class TSAScraper:
     Only when content actually changes do we download the full ~150KB page.
     """
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(self, timeout: float = 30.0, client: Optional[httpx.AsyncClient] = None):
         self.timeout = timeout
         self._last_known_date: Optional[date] = None
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = client
+        self._owns_client = client is None  # Injected clients are closed by their owner
         self._last_modified: Optional[str] = None  # Last-Modified header from server
         self._etag: Optional[str] = None  # ETag header from server
         self._conditional_hits: int = 0  # 304 responses (no change)
         self._conditional_misses: int = 0  # 200 responses (content changed)
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            headers=DEFAULT_HEADERS,
-            timeout=self.timeout,
-            follow_redirects=True,
-        )
+        # Re-entering keeps the open client and its warm connections
+        if self._owns_client and self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300),
+                verify=_SSL_CTX,
+            )
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
+        if self._client and self._owns_client:
             await self._client.aclose()
+            self._client = None
 
     @property
     def last_known_date(self) -> Optional[date]:
@@ -107,17 +141,19 @@ class TSAScraper:
         # Cache-bust with timestamp to bypass CDN/Akamai 10-min TTL
         cache_buster = int(time.time() * 1000)
         url = f"{TSA_URL}?_={cache_buster}"
-        logger.debug(f"Fetching {url}")
-        response = await self._client.get(url)
+        logger.debug("Fetching %s", url)
+        response = await self._client.get(
+            url, headers=DEFAULT_HEADERS, follow_redirects=True
+        )
         response.raise_for_status()
 
         # Store conditional headers for future lightweight requests
         if "Last-Modified" in response.headers:
             self._last_modified = response.headers["Last-Modified"]
-            logger.debug(f"Stored Last-Modified: {self._last_modified}")
+            logger.debug("Stored Last-Modified: %s", self._last_modified)
         if "ETag" in response.headers:
             self._etag = response.headers["ETag"]
-            logger.debug(f"Stored ETag: {self._etag}")
+            logger.debug("Stored ETag: %s", self._etag)
 
         return response.text
 
@@ -143,24 +179,28 @@ class TSAScraper:
         # Build conditional request headers
         cache_buster = int(time.time() * 1000)
         url = f"{TSA_URL}?_={cache_buster}"
-        conditional_headers = {}
+        conditional_headers = dict(DEFAULT_HEADERS)
         if self._last_modified:
             conditional_headers["If-Modified-Since"] = self._last_modified
         if self._etag:
             conditional_headers["If-None-Match"] = self._etag
 
-        logger.debug(f"Conditional fetch: If-Modified-Since={self._last_modified}")
-        response = await self._client.get(url, headers=conditional_headers)
+        logger.debug("Conditional fetch: If-Modified-Since=%s", self._last_modified)
+        response = await self._client.get(
+            url, headers=conditional_headers, follow_redirects=True
+        )
 
         if response.status_code == 304:
             self._conditional_hits += 1
-            logger.debug(f"304 Not Modified (saved ~150KB) [{self.conditional_stats}]")
+            # Runs every poll - only build the stats string if it will be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("304 Not Modified (saved ~150KB) [%s]", self.conditional_stats)
             return None
 
         # Content changed - we got a 200 with the full page
         response.raise_for_status()
         self._conditional_misses += 1
-        logger.info(f"Content changed! (200 OK, {len(response.text)} bytes) [{self.conditional_stats}]")
+        logger.info("Content changed! (200 OK, %d bytes) [%s]", len(response.text), self.conditional_stats)
 
         # Update conditional headers for next request
         if "Last-Modified" in response.headers:
@@ -171,53 +211,101 @@ class TSAScraper:
         return response.text
 
     def parse_html(self, html: str) -> list[TSADataPoint]:
-        soup = BeautifulSoup(html, "html.parser")
-        data_points = []
-        table = soup.find("table")
-        if not table:
-            logger.warning("No table found in TSA page")
-            return []
-        rows = table.find_all("tr")
-        for row in rows[1:]:
-            cells = row.find_all(["td", "th"])
-            if len(cells) < 2:
-                continue
-            try:
-                date_text = cells[0].get_text(strip=True)
-                parsed_date = self._parse_date(date_text)
-                if not parsed_date:
-                    continue
-                count_text = cells[1].get_text(strip=True)
-                passenger_count = self._parse_count(count_text)
-                if passenger_count is None:
-                    continue
-                year_ago_count = None
-                if len(cells) >= 3:
-                    year_ago_text = cells[2].get_text(strip=True)
-                    year_ago_count = self._parse_count(year_ago_text)
-                data_points.append(TSADataPoint(
-                    date=parsed_date,
-                    passenger_count=passenger_count,
-                    year_ago_count=year_ago_count,
-                ))
-            except Exception as e:
-                logger.debug(f"Failed to parse row: {e}")
-                continue
+        rows = self._table_rows(html)
+        data_points = [dp for dp in map(self._parse_row, rows) if dp]
         data_points.sort(key=lambda x: x.date, reverse=True)
         return data_points
 
+    def parse_latest(self, html: str) -> Optional[TSADataPoint]:
+        """Parse only the most recent data point.
+
+        TSA lists days newest first, so this normally parses just the first
+        and last valid rows instead of building every point on the page. If
+        the last row is newer than the first, the page isn't newest-first
+        and the newest of all rows is returned instead.
+        """
+        rows = self._table_rows(html)
+        first = self._first_valid(rows)
+        if first is None:
+            return None
+        last = self._first_valid(reversed(rows))
+        if last.date > first.date:
+            logger.warning("TSA table is not newest-first - scanning every row")
+            return max(
+                (dp for dp in map(self._parse_row, rows) if dp),
+                key=attrgetter("date"),
+            )
+        return first
+
+    def _first_valid(self, rows) -> Optional[TSADataPoint]:
+        for row in rows:
+            data_point = self._parse_row(row)
+            if data_point:
+                return data_point
+        return None
+
+    def _table_rows(self, html: str) -> list:
+        if LexborHTMLParser is not None:
+            table = LexborHTMLParser(html).css_first("table")
+            rows = table.css("tr") if table else None
+        else:
+            table = BeautifulSoup(html, "html.parser").find("table")
+            rows = table.find_all("tr") if table else None
+        if rows is None:
+            logger.warning("No table found in TSA page")
+            return []
+        return rows[1:]
+
+    @staticmethod
+    def _cell_texts(row) -> list[str]:
+        if LexborHTMLParser is not None:
+            return [cell.text(strip=True) for cell in row.css("td, th")]
+        return [cell.get_text(strip=True) for cell in row.find_all(["td", "th"])]
+
+    def _parse_row(self, row) -> Optional[TSADataPoint]:
+        cells = self._cell_texts(row)
+        if len(cells) < 2:
+            return None
+        try:
+            parsed_date = self._parse_date(cells[0])
+            if not parsed_date:
+                return None
+            passenger_count = self._parse_count(cells[1])
+            if passenger_count is None:
+                return None
+            year_ago_count = None
+            if len(cells) >= 3:
+                year_ago_count = self._parse_count(cells[2])
+            return TSADataPoint(
+                date=parsed_date,
+                passenger_count=passenger_count,
+                year_ago_count=year_ago_count,
+            )
+        except Exception as e:
+            logger.debug("Failed to parse row: %s", e)
+            return None
+
     def _parse_date(self, date_text: str) -> Optional[date]:
-        formats = ["%m/%d/%Y", "%m/%d/%y", "%B %d, %Y", "%b %d, %Y"]
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_text, fmt).date()
-            except ValueError:
-                continue
-        logger.debug(f"Could not parse date: {date_text}")
+        # Regex + date() instead of trying strptime formats in turn - called
+        # for every table row
+        try:
+            match = _DATE_NUMERIC_RE.fullmatch(date_text)
+            if match:
+                month, day, year = map(int, match.groups())
+                if len(match.group(3)) == 2:
+                    # Same pivot as strptime's %y
+                    year += 2000 if year < 69 else 1900
+                return date(year, month, day)
+            match = _DATE_TEXT_RE.fullmatch(date_text)
+            if match and match.group(1).lower() in _MONTHS:
+                return date(int(match.group(3)), _MONTHS[match.group(1).lower()], int(match.group(2)))
+        except ValueError:
+            pass
+        logger.debug("Could not parse date: %s", date_text)
         return None
 
     def _parse_count(self, count_text: str) -> Optional[int]:
-        cleaned = re.sub(r"[^\d]", "", count_text)
+        cleaned = _NON_DIGITS_RE.sub("", count_text)
         if not cleaned:
             return None
         try:
@@ -228,12 +316,9 @@ class TSAScraper:
     async def get_latest_data(self) -> Optional[TSADataPoint]:
         try:
             html = await self.fetch_page()
-            data_points = self.parse_html(html)
-            if data_points:
-                return data_points[0]
-            return None
+            return self.parse_latest(html)
         except Exception as e:
-            logger.error(f"Failed to get latest TSA data: {e}")
+            logger.error("Failed to get latest TSA data: %s", e)
             return None
 
     async def check_for_new_data(self) -> Optional[TSADataPoint]:
@@ -242,11 +327,22 @@ class TSAScraper:
         Uses conditional GET (If-Modified-Since) for lightweight polling.
         Only downloads and parses the full page when the server indicates
         content has changed.
+
+        Raises httpx.HTTPStatusError on 429 or 5xx, and httpx.TransportError
+        (connect errors, timeouts) so the caller can back off; other failures
+        are logged and treated as no new data.
         """
         try:
             html = await self.fetch_if_changed()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429 or e.response.status_code >= 500:
+                raise
+            logger.error("Failed to check TSA data: %s", e)
+            return None
+        except httpx.TransportError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to check TSA data: {e}")
+            logger.error("Failed to check TSA data: %s", e)
             return None
 
         if html is None:
@@ -254,23 +350,21 @@ class TSAScraper:
             return None
 
         # Content changed - parse and check for new date
-        data_points = self.parse_html(html)
-        if not data_points:
+        latest = self.parse_latest(html)
+        if not latest:
             return None
 
-        latest = data_points[0]
-
         if self._last_known_date is None:
-            logger.info(f"Initial data point: {latest.date} - {latest.formatted_count}")
+            logger.info("Initial data point: %s - %s", latest.date, latest.formatted_count)
             self._last_known_date = latest.date
             return None
 
         if latest.date > self._last_known_date:
-            logger.info(f"NEW DATA DETECTED: {latest.date} - {latest.formatted_count}")
+            logger.info("NEW DATA DETECTED: %s - %s", latest.date, latest.formatted_count)
             self._last_known_date = latest.date
             return latest
 
-        logger.debug(f"Content changed but same date: {latest.date}")
+        logger.debug("Content changed but same date: %s", latest.date)
         return None
 
     async def get_all_data(self) -> list[TSADataPoint]:
@@ -278,7 +372,7 @@ class TSAScraper:
             html = await self.fetch_page()
             return self.parse_html(html)
         except Exception as e:
-            logger.error(f"Failed to get TSA data: {e}")
+            logger.error("Failed to get TSA data: %s", e)
             return []
 
 